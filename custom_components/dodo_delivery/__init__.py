@@ -1,10 +1,22 @@
 from __future__ import annotations
 
 from datetime import timedelta
+import logging
+from pathlib import Path
+from typing import Any
+
+import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE, EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.debounce import Debouncer
 from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.service import async_register_admin_service
+from homeassistant.helpers.storage import Store
+from homeassistant.util.ssl import get_default_context
 
 from .const import (
     DOMAIN,
@@ -12,11 +24,163 @@ from .const import (
     DEFAULT_POLL_INTERVAL,
     CONF_MODE,
     MODE_ENTITY,
+    MODE_IMAP,
     CONF_CODE_ENTITY,
+    CONF_IMAP_ENTRY_ID,
+    CONF_IMAP_SUBJECT,
+    CONF_IMAP_REQUIRE_LINK,
+    STORAGE_VERSION,
+    SERVICE_REPLAY_CAPTURE,
+    CAPTURE_DIR,
+    SERVICE_IMPORT_STATISTICS,
+    ARCHIVE_FILE,
+    CODE_CHANGE_COOLDOWN,
+    CONF_REGISTER_CARD,
+    DEFAULT_REGISTER_CARD,
 )
+from .api import GaiaApi, create_session
+from .archive import DeliveryArchive
 from .coordinator import DodoDeliveryCoordinator
+from .fleet import FleetIndex
+from .frontend import async_register_card, async_register_card_resource
+from .helpers import extract_codes
+from .imap import async_listen_imap
+from .poller import DodoDeliveryPoller
+from .websocket_api import async_register_websocket_api
+
+_LOGGER = logging.getLogger(__name__)
+
+PLATFORMS: list[str] = ["sensor", "device_tracker"]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+REPLAY_CAPTURE_SCHEMA = vol.Schema(
+    {
+        vol.Required("config_entry_id"): cv.string,
+        vol.Required("file"): cv.string,
+        vol.Optional("speed", default=1.0): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    }
+)
+
+
+async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+    """Domain-wide pieces that exist once per HA instance."""
+    async_register_websocket_api(hass)
+    hass.data.setdefault(DOMAIN, {})["_card_url"] = await async_register_card(hass)
+
+    async def _async_replay_capture(call: ServiceCall) -> None:
+        entry_id = call.data["config_entry_id"]
+        coordinator = hass.data.get(DOMAIN, {}).get(entry_id) if not entry_id.startswith("_") else None
+        if coordinator is None:
+            raise HomeAssistantError(f"DODO delivery entry {entry_id} is not loaded")
+        if coordinator.replaying:
+            raise HomeAssistantError("A capture is already being replayed into this entry")
+        path = await hass.async_add_executor_job(_capture_path, hass, call.data["file"])
+        hass.async_create_background_task(
+            coordinator.async_replay(path, call.data["speed"]), f"{DOMAIN} replay {path.name}"
+        )
+
+    # Admin only: it rewrites what an entry shows and reads files from the config directory.
+    async_register_admin_service(hass, DOMAIN, SERVICE_REPLAY_CAPTURE, _async_replay_capture, schema=REPLAY_CAPTURE_SCHEMA)
+
+    async def _async_import_statistics(call: ServiceCall) -> None:
+        archive = hass.data.get(DOMAIN, {}).get("_archive")
+        if archive is None:
+            raise HomeAssistantError("No DODO delivery entry is loaded")
+        count = archive.async_import_all()
+        _LOGGER.info("Imported statistics of %s archived deliveries", count)
+
+    # Admin only: it rewrites the recorder's long-term statistics.
+    async_register_admin_service(hass, DOMAIN, SERVICE_IMPORT_STATISTICS, _async_import_statistics)
+    return True
+
+
+def _capture_path(hass: HomeAssistant, file: str) -> Path:
+    """Capture file inside <config>/dodo_delivery_captures (blocking: resolves symlinks).
+
+    Accepted as "ABCD1234.jsonl.gz" or "dodo_delivery_captures/ABCD1234.jsonl.gz";
+    anything resolving outside that directory is refused.
+    """
+    capture_dir = Path(hass.config.path(CAPTURE_DIR)).resolve()
+    relative = Path(file)
+    if relative.parts[:1] == (CAPTURE_DIR,):
+        relative = Path(*relative.parts[1:])
+    path = (capture_dir / relative).resolve()
+    if relative.is_absolute() or not path.is_relative_to(capture_dir):
+        raise HomeAssistantError(f"Capture files must be in {CAPTURE_DIR}/: {file}")
+    if not path.is_file():
+        raise HomeAssistantError(f"Capture file not found: {file}")
+    return path
+
+
+def _get_poller(hass: HomeAssistant) -> DodoDeliveryPoller:
+    """One poller per HA instance, shared by every config entry."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    poller = domain_data.get("_poller")
+    if poller is None:
+        poller = domain_data["_poller"] = DodoDeliveryPoller(hass)
+    return poller
+
+
+def _get_api(hass: HomeAssistant) -> GaiaApi:
+    """Integration-owned connection pool for the Gaia API, shared by every config entry."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    api = domain_data.get("_api")
+    if api is None:
+        api = domain_data["_api"] = GaiaApi(create_session(get_default_context()))
+
+        async def _close_on_stop(_event: Event) -> None:
+            # Entries aren't unloaded on shutdown: close the pool here, or aiohttp warns about it.
+            await api.async_close()
+
+        domain_data["_api_unsub"] = hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _close_on_stop)
+    return api
+
+
+def _get_fleet(hass: HomeAssistant) -> FleetIndex:
+    """Summary of the deliveries of every config entry (the fleet sensor reads it)."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    fleet = domain_data.get("_fleet")
+    if fleet is None:
+        fleet = domain_data["_fleet"] = FleetIndex(hass)
+    return fleet
+
+
+async def _async_get_archive(hass: HomeAssistant) -> DeliveryArchive:
+    """Archive of completed deliveries, shared by every config entry."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    archive = domain_data.get("_archive")
+    if archive is None:
+        archive = DeliveryArchive(hass, Path(hass.config.path(ARCHIVE_FILE)))
+        await archive.async_load()
+        if "_archive" not in domain_data:
+            domain_data["_archive"] = archive
+
+            @callback
+            def _flush_on_stop(_event: Event) -> None:
+                # Entries aren't unloaded on stop: push the pending statistics batch then.
+                archive.async_shutdown()
+
+            domain_data["_archive_unsub"] = hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _flush_on_stop)
+        # Another entry may have finished loading it meanwhile.
+        archive = domain_data["_archive"]
+    return archive
+
+
+def _code_source(entry: ConfigEntry) -> tuple[Any, ...]:
+    """Where the codes come from; set up once per entry (entity or IMAP listener, IMAP store)."""
+    opts = {**entry.data, **entry.options}
+    mode = opts.get(CONF_MODE)
+    if mode == MODE_ENTITY:
+        return (mode, opts.get(CONF_CODE_ENTITY))
+    if mode == MODE_IMAP:
+        return (mode, opts.get(CONF_IMAP_ENTRY_ID), opts.get(CONF_IMAP_SUBJECT), opts.get(CONF_IMAP_REQUIRE_LINK))
+    return (mode,)
+
+
+def _has_entries(hass: HomeAssistant) -> bool:
+    return any(not key.startswith("_") for key in hass.data.get(DOMAIN, {}))
 
-PLATFORMS: list[str] = ["sensor"]
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     poll_interval = entry.options.get(CONF_POLL_INTERVAL, DEFAULT_POLL_INTERVAL)
@@ -24,22 +188,70 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass=hass,
         entry=entry,
         update_interval=timedelta(seconds=int(poll_interval)),
+        poller=_get_poller(hass),
+        api=_get_api(hass),
+        archive=await _async_get_archive(hass),
+        fleet=_get_fleet(hass),
     )
-    await coordinator.async_config_entry_first_refresh()
+    if await coordinator.async_restore():
+        # Entities start from the persisted snapshot; the network catches up in the background.
+        entry.async_create_background_task(hass, coordinator.async_refresh(), f"{DOMAIN} first refresh")
+    else:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except Exception:
+            # Setup is retried with a new coordinator: this one must leave the shared poller and fleet.
+            await coordinator.async_shutdown()
+            raise
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
 
     # If the integration is configured to read the tracking code from a helper entity,
     # refresh immediately when that helper changes (e.g., IMAP blueprint updates it).
+    # This is also the only wake-up source while the coordinator idles without a code.
     mode = entry.options.get(CONF_MODE, entry.data.get(CONF_MODE))
     if mode == MODE_ENTITY:
         ent_id = entry.options.get(CONF_CODE_ENTITY, entry.data.get(CONF_CODE_ENTITY))
         if ent_id:
-            async def _on_code_change(event):
-                coordinator.async_request_refresh()
+            # A burst of helper writes (e.g. an automation setting it twice) gives one refresh
+            # once it settles, and writes that leave the codes as they were give none.
+            debouncer = Debouncer(
+                hass, _LOGGER, cooldown=CODE_CHANGE_COOLDOWN, immediate=False, function=coordinator.async_refresh
+            )
+
+            @callback
+            def _on_code_change(event: Event) -> None:
+                old_state, new_state = event.data.get("old_state"), event.data.get("new_state")
+                if extract_codes(old_state.state if old_state else None) == extract_codes(new_state.state if new_state else None):
+                    return
+                debouncer.async_schedule_call()
+
+            unsub_state = async_track_state_change_event(hass, [ent_id], _on_code_change)
+
+            def unsub() -> None:
+                unsub_state()
+                debouncer.async_shutdown()
 
-            unsub = async_track_state_change_event(hass, [ent_id], _on_code_change)
             hass.data.setdefault(DOMAIN, {}).setdefault("_unsub", {})[entry.entry_id] = unsub
+    elif mode == MODE_IMAP:
+        # Codes arrive straight from imap_content events, no helper entity in between.
+        hass.data.setdefault(DOMAIN, {}).setdefault("_unsub", {})[entry.entry_id] = async_listen_imap(hass, entry, coordinator)
+
+    # Options apply in place; only a new code source needs the listeners above rebuilt.
+    code_source = _code_source(entry)
+
+    async def _async_entry_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+        if _code_source(entry) != code_source:
+            await async_reload_entry(hass, entry)
+            return
+        coordinator.async_apply_options()
+        if entry.options.get(CONF_REGISTER_CARD, DEFAULT_REGISTER_CARD):
+            await async_register_card_resource(hass, hass.data[DOMAIN]["_card_url"])
+
+    entry.async_on_unload(entry.add_update_listener(_async_entry_updated))
+
+    if entry.options.get(CONF_REGISTER_CARD, DEFAULT_REGISTER_CARD):
+        await async_register_card_resource(hass, hass.data[DOMAIN]["_card_url"])
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
@@ -51,9 +263,40 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         unsub = hass.data.get(DOMAIN, {}).get("_unsub", {}).pop(entry.entry_id, None)
         if unsub:
             unsub()
-        hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
+        coordinator = hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
+        if coordinator is not None:
+            await coordinator.async_shutdown()
+        if not _has_entries(hass):
+            poller = hass.data.get(DOMAIN, {}).pop("_poller", None)
+            if poller is not None:
+                poller.async_shutdown()
+            api = hass.data.get(DOMAIN, {}).pop("_api", None)
+            if api is not None:
+                await api.async_close()
+            # Absent when the API was provided from outside (e.g. tools/benchmark.py).
+            unsub_close = hass.data.get(DOMAIN, {}).pop("_api_unsub", None)
+            if unsub_close is not None:
+                unsub_close()
+            archive = hass.data.get(DOMAIN, {}).pop("_archive", None)
+            if archive is not None:
+                archive.async_shutdown()
+            unsub_stop = hass.data.get(DOMAIN, {}).pop("_archive_unsub", None)
+            if unsub_stop is not None:
+                unsub_stop()
+            hass.data.get(DOMAIN, {}).pop("_fleet", None)
     return unload_ok
 
 
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the persisted snapshots of a deleted entry (one per tracking code)."""
+    prefix = DodoDeliveryCoordinator.storage_key(entry.entry_id)
+    storage_dir = Path(hass.config.path(".storage"))
+    keys = await hass.async_add_executor_job(
+        lambda: [path.name for path in storage_dir.glob(f"{prefix}.*")]
+    )
+    for key in [prefix, *keys]:
+        await Store(hass, STORAGE_VERSION, key).async_remove()
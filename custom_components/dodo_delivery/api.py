@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Iterable, Mapping
+import hashlib
+import json
+import ssl
+import time
+from typing import Any, NamedTuple
+
+import aiohttp
+from yarl import URL
+
+from .const import (
+    API_BASE,
+    DETAIL_PATH,
+    STATUS_PATH,
+    HTTP_CONNECTIONS_PER_HOST,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    RESPONSE_CACHE_TTL,
+)
+from .resilience import CircuitBreaker, parse_retry_after
+
+try:
+    # orjson-backed loader of Home Assistant; plain json when used outside of it (tools/)
+    from homeassistant.util.json import json_loads
+except ImportError:
+    json_loads = json.loads
+
+# Payload marker for "same as last time" (304, or identical body digest).
+UNCHANGED: Any = object()
+
+Validators = tuple[str | None, str | None]
+# (status, headers, body) of one GET on the wire
+Response = tuple[int, Mapping[str, str], bytes | None]
+
+
+class GaiaApiError(Exception):
+    """Request to the Gaia API failed (network, HTTP error status or invalid JSON)."""
+
+    def __init__(
+        self, message: str, status: int | None = None, retry_after: float | None = None, shared: bool = False
+    ) -> None:
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        # The failed response belonged to another caller's request (see FetchResult.shared)
+        self.shared = shared
+
+
+class CircuitOpenError(GaiaApiError):
+    """Request not sent: the host's circuit breaker is open."""
+
+
+class FetchResult(NamedTuple):
+    status: int
+    payload: Any
+    digest: bytes | None
+    validators: Validators
+    # Raw response body (2xx only), request and JSON decoding durations, for recording/metrics
+    body: bytes | None = None
+    elapsed: float = 0.0
+    decode: float = 0.0
+    # Answered by another caller's request (in flight or just cached)
+    shared: bool = False
+
+
+class BatchResult(NamedTuple):
+    """One code of `GaiaApi.async_fetch_many`: payloads (None on 404) or the error."""
+
+    code: str
+    detail: Any
+    status: Any
+    error: str | None = None
+    elapsed: float = 0.0
+
+
+def create_session(ssl_context: ssl.SSLContext | bool = True) -> aiohttp.ClientSession:
+    """Connection pool for api.gaia.delivery: keep-alive, DNS cache, per-host limit."""
+    connector = aiohttp.TCPConnector(
+        limit_per_host=HTTP_CONNECTIONS_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        ssl=ssl_context,
+    )
+    timeout = aiohttp.ClientTimeout(total=None, connect=HTTP_CONNECT_TIMEOUT, sock_read=HTTP_READ_TIMEOUT)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, raise_for_status=False)
+
+
+class GaiaApi:
+    """Thin HTTP layer over one shared session.
+
+    Conditional request state (validators, last body digest) belongs to the
+    caller and is passed in, so several entries can share the API object.
+    The per-host circuit breakers are shared state on purpose, and so is the
+    single-flight layer: concurrent callers asking for the same URL with the
+    same conditional headers share one request, and a 2xx response is reused
+    by anyone asking for that URL within `cache_ttl` seconds.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, base_url: str = API_BASE, cache_ttl: float = RESPONSE_CACHE_TTL) -> None:
+        self.session = session
+        self.base_url = base_url
+        self.cache_ttl = cache_ttl
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self._inflight: dict[tuple[str, tuple[tuple[str, str], ...]], asyncio.Future[Response]] = {}
+        self._responses: dict[str, tuple[float, Response]] = {}
+        self.stats: dict[str, int] = {"requests": 0, "coalesced": 0, "cache_hits": 0}
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        host = URL(url).host or ""
+        if host not in self.breakers:
+            self.breakers[host] = CircuitBreaker()
+        return self.breakers[host]
+
+    def detail_url(self, code: str) -> str:
+        return f"{self.base_url}{DETAIL_PATH.format(code=code)}"
+
+    def status_url(self, code: str) -> str:
+        return f"{self.base_url}{STATUS_PATH.format(code=code)}"
+
+    async def async_close(self) -> None:
+        for flight in list(self._inflight.values()):
+            flight.cancel()
+        await self.session.close()
+
+    async def async_fetch_detail(self, code: str) -> Any:
+        """Order detail of `code` (None if unknown), without conditional request state."""
+        return (await self.async_get_json(self.detail_url(code), "detail")).payload
+
+    async def async_fetch_status(self, code: str) -> Any:
+        """Live status of `code` (None if unknown), without conditional request state."""
+        return (await self.async_get_json(self.status_url(code), "status")).payload
+
+    async def async_fetch_many(
+        self, codes: Iterable[str], concurrency: int = HTTP_CONNECTIONS_PER_HOST, detail: bool = True
+    ) -> AsyncIterator[BatchResult]:
+        """Fetch many codes, yielding each result as soon as it is complete.
+
+        At most `concurrency` codes are fetched at a time over the pooled
+        session; failures are reported per code instead of being raised.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _fetch(code: str) -> BatchResult:
+            async with semaphore:
+                started = time.monotonic()
+                try:
+                    if detail:
+                        detail_payload, status_payload = await asyncio.gather(
+                            self.async_fetch_detail(code), self.async_fetch_status(code)
+                        )
+                    else:
+                        detail_payload, status_payload = None, await self.async_fetch_status(code)
+                except GaiaApiError as err:
+                    return BatchResult(code, None, None, str(err) or type(err).__name__, time.monotonic() - started)
+                return BatchResult(code, detail_payload, status_payload, None, time.monotonic() - started)
+
+        tasks = [asyncio.ensure_future(_fetch(code)) for code in dict.fromkeys(codes)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # The consumer stopped early (or was cancelled): drop what is still queued.
+            for task in tasks:
+                task.cancel()
+
+    async def async_get_json(
+        self,
+        url: str,
+        kind: str,
+        validators: Validators = (None, None),
+        known_digest: bytes | None = None,
+    ) -> FetchResult:
+        """GET a JSON document with conditional requests.
+
+        The payload is UNCHANGED on 304 or when the body hashes to
+        `known_digest` (JSON decoding is skipped), and None on 404.
+        """
+        started = time.monotonic()
+        cached = self._responses.get(url)
+        if cached is not None and cached[0] > started:
+            self.stats["cache_hits"] += 1
+            status, resp_headers, body = cached[1]
+            shared = True
+        else:
+            headers: dict[str, str] = {}
+            etag, last_modified = validators
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+            key = (url, tuple(sorted(headers.items())))
+            flight = self._inflight.get(key)
+            shared = flight is not None
+            if shared:
+                self.stats["coalesced"] += 1
+            else:
+                breaker = self.breaker(url)
+                if not breaker.allow_request():
+                    raise CircuitOpenError(f"Circuit open for {kind}", retry_after=breaker.retry_in() or None)
+                flight = self._inflight[key] = asyncio.ensure_future(self._async_fetch(url, kind, headers, breaker))
+                flight.add_done_callback(lambda done, key=key: self._flight_done(key, done))
+            # Shielded: a caller giving up must not cancel the request for the others.
+            try:
+                status, resp_headers, body = await asyncio.shield(flight)
+            except GaiaApiError as err:
+                if not shared:
+                    raise
+                # Every caller of the flight gets the same error object: hand this one its own.
+                raise GaiaApiError(str(err), err.status, err.retry_after, shared=True) from err
+        elapsed = time.monotonic() - started
+
+        if status == 304:
+            return FetchResult(status, UNCHANGED, known_digest, validators, None, elapsed, shared=shared)
+        if status == 404:
+            return FetchResult(status, None, None, (None, None), None, elapsed, shared=shared)
+        if status >= 400 or body is None:
+            raise GaiaApiError(f"HTTP {status}", status, shared=shared)
+        new_validators = (resp_headers.get("ETag"), resp_headers.get("Last-Modified"))
+
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        if digest == known_digest:
+            return FetchResult(status, UNCHANGED, digest, new_validators, body, elapsed, shared=shared)
+        decode_started = time.monotonic()
+        try:
+            payload = json_loads(body)
+        except ValueError as err:
+            raise GaiaApiError(f"Invalid JSON ({kind}): {err}", shared=shared) from err
+        decode = time.monotonic() - decode_started
+        return FetchResult(status, payload, digest, new_validators, body, elapsed, decode, shared)
+
+    async def _async_fetch(self, url: str, kind: str, headers: dict[str, str], breaker: CircuitBreaker) -> Response:
+        """The single request behind a flight: feeds the breaker and the response cache."""
+        self.stats["requests"] += 1
+        try:
+            response = await self._async_request(url, headers)
+        except asyncio.CancelledError:
+            breaker.cancel_probe()
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            breaker.record_failure()
+            raise GaiaApiError(f"Request failed ({kind}): {err}") from err
+
+        status, resp_headers, body = response
+        if status == 429 or status >= 500:
+            breaker.record_failure()
+            raise GaiaApiError(f"HTTP {status}", status, parse_retry_after(resp_headers.get("Retry-After")))
+        breaker.record_success()
+        if self.cache_ttl > 0 and 200 <= status < 300 and body is not None:
+            now = time.monotonic()
+            self._responses = {u: c for u, c in self._responses.items() if c[0] > now}
+            self._responses[url] = (now + self.cache_ttl, response)
+        return response
+
+    def _flight_done(self, key: tuple[str, tuple[tuple[str, str], ...]], flight: asyncio.Future[Response]) -> None:
+        self._inflight.pop(key, None)
+        # Retrieve the error even when every caller was cancelled, so it isn't logged as unhandled.
+        if not flight.cancelled():
+            flight.exception()
+
+    async def _async_request(self, url: str, headers: dict[str, str]) -> tuple[int, Mapping[str, str], bytes | None]:
+        """One GET on the wire; the body is only read for 2xx responses."""
+        async with self.session.get(url, headers=headers) as resp:
+            body = await resp.read() if 200 <= resp.status < 300 else None
+            return resp.status, resp.headers, body
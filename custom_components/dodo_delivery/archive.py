@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime
+import json
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, STATISTICS_BATCH_DELAY
+from .model import DeliverySnapshot
+
+if TYPE_CHECKING:
+    from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+
+_LOGGER = logging.getLogger(__name__)
+
+# External statistics (source: the integration), one row per hour with deliveries
+STAT_LATENESS = f"{DOMAIN}:lateness"
+STAT_DURATION = f"{DOMAIN}:duration"
+STAT_DELIVERIES = f"{DOMAIN}:deliveries"
+
+_METADATA: dict[str, StatisticMetaData] = {
+    STAT_LATENESS: {
+        "has_mean": True,
+        "has_sum": False,
+        "name": "DODO delivery lateness",
+        "source": DOMAIN,
+        "statistic_id": STAT_LATENESS,
+        "unit_of_measurement": "min",
+    },
+    STAT_DURATION: {
+        "has_mean": True,
+        "has_sum": False,
+        "name": "DODO delivery duration",
+        "source": DOMAIN,
+        "statistic_id": STAT_DURATION,
+        "unit_of_measurement": "min",
+    },
+    STAT_DELIVERIES: {
+        "has_mean": False,
+        "has_sum": True,
+        "name": "DODO deliveries",
+        "source": DOMAIN,
+        "statistic_id": STAT_DELIVERIES,
+        "unit_of_measurement": None,
+    },
+}
+
+
+def _minutes(later: datetime | None, earlier: datetime | None) -> float | None:
+    if later is None or earlier is None:
+        return None
+    return round((later - earlier).total_seconds() / 60, 1)
+
+
+def archive_record(code: str, snapshot: DeliverySnapshot, finished_at: datetime) -> dict[str, Any]:
+    """One line of the archive: what the delivery analysis needs, nothing else."""
+    agent = snapshot.source.get("agent") or {}
+    return {
+        "code": code,
+        "finished": finished_at.isoformat(),
+        "status": snapshot.status,
+        "required_start": snapshot.required_start.isoformat() if snapshot.required_start else None,
+        "required_end": snapshot.required_end.isoformat() if snapshot.required_end else None,
+        "started": snapshot.started.isoformat() if snapshot.started else None,
+        # Positive: after the end of the promised window; negative: early
+        "lateness_min": _minutes(finished_at, snapshot.required_end),
+        # Pickup (courier leaves the store) to drop
+        "duration_min": _minutes(finished_at, snapshot.started),
+        "agent_id": agent.get("agentIdentifier"),
+        "agent_name": snapshot.agent_name,
+        "vehicle_name": snapshot.vehicle_name,
+    }
+
+
+def aggregate_hourly(records: list[dict[str, Any]], since: datetime | None = None) -> dict[str, list[StatisticData]]:
+    """Hourly rows for the external statistics, from `since` (hour aligned) on.
+
+    The delivery count carries a running sum over the whole archive, so rows
+    before `since` are still counted.
+    """
+    hours: dict[datetime, list[dict[str, Any]]] = defaultdict(list)
+    for rec in records:
+        finished = dt_util.parse_datetime(rec["finished"])
+        if finished is not None:
+            hours[dt_util.as_utc(finished).replace(minute=0, second=0, microsecond=0)].append(rec)
+
+    result: dict[str, list[StatisticData]] = {STAT_LATENESS: [], STAT_DURATION: [], STAT_DELIVERIES: []}
+    total = 0
+    for start in sorted(hours):
+        recs = hours[start]
+        total += len(recs)
+        if since is not None and start < since:
+            continue
+        result[STAT_DELIVERIES].append({"start": start, "state": len(recs), "sum": total})
+        for statistic_id, key in ((STAT_LATENESS, "lateness_min"), (STAT_DURATION, "duration_min")):
+            values = [rec[key] for rec in recs if rec.get(key) is not None]
+            if values:
+                result[statistic_id].append(
+                    {"start": start, "mean": sum(values) / len(values), "min": min(values), "max": max(values)}
+                )
+    return result
+
+
+class DeliveryArchive:
+    """Append-only JSON Lines archive of completed deliveries, shared by all entries.
+
+    Each delivery is written once, when it is first seen finished. New records
+    are pushed to the long-term statistics in batches (hourly aggregates), so
+    dashboards never scan the state history of the large main sensor.
+    """
+
+    def __init__(self, hass: HomeAssistant, path: Path) -> None:
+        self.hass = hass
+        self.path = path
+        self.records: list[dict[str, Any]] = []
+        self._keys: set[tuple[str, str]] = set()
+        self._pending: list[dict[str, Any]] = []
+        self._flush_unsub: CALLBACK_TYPE | None = None
+
+    async def async_load(self) -> None:
+        self.records = await self.hass.async_add_executor_job(self._read)
+        self._keys = {(rec["code"], rec["finished"]) for rec in self.records}
+
+    def _read(self) -> list[dict[str, Any]]:
+        if not self.path.is_file():
+            return []
+        records = []
+        with self.path.open(encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    _LOGGER.warning("Skipping a damaged line of %s", self.path)
+        return records
+
+    def _append(self, record: dict[str, Any]) -> None:
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n")
+
+    @callback
+    def async_add(self, record: dict[str, Any]) -> None:
+        key = (record["code"], record["finished"])
+        if key in self._keys:
+            return
+        self._keys.add(key)
+        self.records.append(record)
+        self.hass.async_add_executor_job(self._append, record)
+        self._pending.append(record)
+        if self._flush_unsub is None:
+            self._flush_unsub = async_call_later(self.hass, STATISTICS_BATCH_DELAY, self._handle_flush)
+
+    @callback
+    def _handle_flush(self, _now: datetime) -> None:
+        self._flush_unsub = None
+        self._flush()
+
+    @callback
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        since = min(dt_util.parse_datetime(rec["finished"]) for rec in self._pending)
+        self._pending = []
+        self._import(aggregate_hourly(self.records, dt_util.as_utc(since).replace(minute=0, second=0, microsecond=0)))
+
+    @callback
+    def async_import_all(self) -> int:
+        """Bulk (re)import of the whole archive; returns the number of deliveries."""
+        self._pending = []
+        self._import(aggregate_hourly(self.records))
+        return len(self.records)
+
+    @callback
+    def _import(self, statistics: dict[str, list[StatisticData]]) -> None:
+        if "recorder" not in self.hass.config.components:
+            return
+        # Imported on use: the recorder is only an after-dependency and may not be set up.
+        from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+        for statistic_id, rows in statistics.items():
+            if rows:
+                async_add_external_statistics(self.hass, _METADATA[statistic_id], rows)
+
+    @callback
+    def async_shutdown(self) -> None:
+        if self._flush_unsub is not None:
+            self._flush_unsub()
+            self._flush_unsub = None
+        self._flush()
+
+    def since(self, since: datetime | None = None) -> list[dict[str, Any]]:
+        if since is None:
+            return list(self.records)
+        return [rec for rec in self.records if (dt_util.parse_datetime(rec["finished"]) or since) >= since]
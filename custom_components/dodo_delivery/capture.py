@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+import time
+from typing import Any
+
+import aiohttp
+
+from .api import FetchResult, GaiaApi
+from .const import CAPTURE_FLUSH_EVERY
+
+
+class TrafficRecorder:
+    """Buffers Gaia responses for one tracking code and appends them to a gzip JSONL file.
+
+    One record per response: {"t", "kind", "status", "elapsed_ms", "body"}; a body
+    identical to the previous one of the same kind is stored as "unchanged"
+    instead, failures as "error". `take()` runs in the event loop, `write()`
+    in the executor.
+    """
+
+    def __init__(self, path: Path, flush_every: int = CAPTURE_FLUSH_EVERY) -> None:
+        self.path = path
+        self.flush_every = flush_every
+        self._buffer: list[dict[str, Any]] = []
+        self._last_digest: dict[str, bytes | None] = {}
+
+    @property
+    def should_flush(self) -> bool:
+        return len(self._buffer) >= self.flush_every
+
+    def record(self, kind: str, result: FetchResult) -> None:
+        rec: dict[str, Any] = {
+            "t": round(time.time(), 3),
+            "kind": kind,
+            "status": result.status,
+            "elapsed_ms": round(result.elapsed * 1000, 1),
+        }
+        if result.body is not None:
+            if result.digest is not None and self._last_digest.get(kind) == result.digest:
+                rec["unchanged"] = True
+            else:
+                rec["body"] = result.body.decode("utf-8", "replace")
+            self._last_digest[kind] = result.digest
+        self._buffer.append(rec)
+
+    def record_error(self, kind: str, message: str) -> None:
+        self._buffer.append({"t": round(time.time(), 3), "kind": kind, "error": message})
+
+    def take(self) -> list[dict[str, Any]]:
+        records, self._buffer = self._buffer, []
+        return records
+
+    def write(self, records: list[dict[str, Any]]) -> None:
+        """Append records as one gzip member (blocking)."""
+        if not records:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self.path, "at", encoding="utf-8") as fh:
+            for rec in records:
+                fh.write(json.dumps(rec, separators=(",", ":")) + "\n")
+
+
+def load_capture(path: Path) -> list[dict[str, Any]]:
+    """Read a capture file (blocking)."""
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+class ReplayApi(GaiaApi):
+    """GaiaApi that answers from a capture instead of the network.
+
+    Responses are handed out per kind (detail/status) in recorded order,
+    whatever tracking code is asked for; once a kind runs out its last
+    response is repeated.
+    """
+
+    def __init__(self, records: list[dict[str, Any]]) -> None:
+        # No response cache: consecutive replayed polls must each get the next record.
+        super().__init__(session=None, cache_ttl=0)  # type: ignore[arg-type]
+        self._queues: dict[str, list[dict[str, Any]]] = {}
+        for rec in records:
+            self._queues.setdefault(rec["kind"], []).append(rec)
+        self._last_body: dict[str, bytes | None] = {}
+
+    async def async_close(self) -> None:
+        return None
+
+    def status_times(self) -> list[float]:
+        return [rec["t"] for rec in self._queues.get("status", [])]
+
+    async def _async_request(self, url: str, headers: dict[str, str]) -> tuple[int, dict[str, str], bytes | None]:
+        kind = url.rstrip("/").rsplit("/", 1)[-1]
+        queue = self._queues.get(kind)
+        if not queue:
+            raise aiohttp.ClientError(f"No recorded {kind} response")
+        rec = queue.pop(0) if len(queue) > 1 else queue[0]
+        if "error" in rec:
+            raise aiohttp.ClientError(rec["error"])
+        if "body" in rec:
+            self._last_body[kind] = rec["body"].encode("utf-8")
+        body = self._last_body.get(kind) if "body" in rec or rec.get("unchanged") else None
+        return rec["status"], {}, body
@@ -3,7 +3,7 @@ from __future__ import annotations
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import selector
 
 from .const import (
@@ -11,23 +11,55 @@ from .const import (
     CONF_MODE,
     MODE_MANUAL,
     MODE_ENTITY,
+    MODE_IMAP,
     CONF_TRACKING_CODE,
     CONF_CODE_ENTITY,
+    CONF_IMAP_ENTRY_ID,
+    CONF_IMAP_SUBJECT,
+    DEFAULT_IMAP_SUBJECT,
+    CONF_IMAP_REQUIRE_LINK,
+    DEFAULT_IMAP_REQUIRE_LINK,
     CONF_POLL_INTERVAL,
     DEFAULT_POLL_INTERVAL,
     CONF_RETENTION_HOURS,
     DEFAULT_RETENTION_HOURS,
     CONF_INCLUDE_DESTINATION,
     DEFAULT_INCLUDE_DESTINATION,
+    CONF_ADAPTIVE_POLLING,
+    DEFAULT_ADAPTIVE_POLLING,
+    CONF_NEAR_POLL_INTERVAL,
+    DEFAULT_NEAR_POLL_INTERVAL,
+    CONF_IDLE_POLL_INTERVAL,
+    DEFAULT_IDLE_POLL_INTERVAL,
+    CONF_RECORD_TRAFFIC,
+    DEFAULT_RECORD_TRAFFIC,
+    CONF_COLLECT_METRICS,
+    DEFAULT_COLLECT_METRICS,
+    CONF_PROXIMITY_DISTANCE,
+    DEFAULT_PROXIMITY_DISTANCE,
+    CONF_REGISTER_CARD,
+    DEFAULT_REGISTER_CARD,
 )
-from .helpers import extract_code
+from .helpers import extract_code, extract_codes
 
 
 def _validate_code(value: str) -> str:
-    code = extract_code(value)
-    if not code:
+    """Normalize one or more codes/links to a comma separated list of codes."""
+    codes = extract_codes(value)
+    if not codes:
         raise vol.Invalid("Invalid tracking code (expected 8 chars A-Z/0-9 or a t.idodo.group link)")
-    return code
+    return ", ".join(codes)
+
+
+def _imap_schema(current) -> dict:
+    """IMAP mode fields: the IMAP entry whose emails are scanned and the cheap pre-filters."""
+    return {
+        vol.Required(CONF_IMAP_ENTRY_ID, default=current.get(CONF_IMAP_ENTRY_ID, "")): selector.ConfigEntrySelector(
+            selector.ConfigEntrySelectorConfig(integration="imap")
+        ),
+        vol.Optional(CONF_IMAP_SUBJECT, default=current.get(CONF_IMAP_SUBJECT, DEFAULT_IMAP_SUBJECT)): str,
+        vol.Optional(CONF_IMAP_REQUIRE_LINK, default=bool(current.get(CONF_IMAP_REQUIRE_LINK, DEFAULT_IMAP_REQUIRE_LINK))): bool,
+    }
 
 
 class DodoDeliveryConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -39,11 +71,13 @@ class DodoDeliveryConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             mode = user_input[CONF_MODE]
             if mode == MODE_MANUAL:
                 return await self.async_step_manual()
+            if mode == MODE_IMAP:
+                return await self.async_step_imap()
             return await self.async_step_entity()
 
         schema = vol.Schema(
             {
-                vol.Required(CONF_MODE, default=MODE_ENTITY): vol.In([MODE_ENTITY, MODE_MANUAL]),
+                vol.Required(CONF_MODE, default=MODE_ENTITY): vol.In([MODE_ENTITY, MODE_MANUAL, MODE_IMAP]),
             }
         )
         return self.async_show_form(step_id="user", data_schema=schema)
@@ -94,12 +128,32 @@ class DodoDeliveryConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
         return self.async_show_form(step_id="entity", data_schema=schema, errors=errors)
 
+    async def async_step_imap(self, user_input=None):
+        """Step 2c: tracking codes from emails received by the IMAP integration."""
+        errors = {}
+        if user_input is not None:
+            if not user_input.get(CONF_IMAP_ENTRY_ID):
+                errors[CONF_IMAP_ENTRY_ID] = "required"
+            else:
+                data = {CONF_MODE: MODE_IMAP, **user_input}
+                return self.async_create_entry(title="DODO delivery", data=data)
+
+        return self.async_show_form(step_id="imap", data_schema=vol.Schema(_imap_schema({})), errors=errors)
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> OptionsFlowHandler:
+        return OptionsFlowHandler()
+
     async def async_step_options(self, user_input=None):
         return await OptionsFlowHandler(self.hass, self.context).async_step_init(user_input)
 class OptionsFlowHandler(config_entries.OptionsFlow):
-    def __init__(self, hass: HomeAssistant, context) -> None:
-        self.hass = hass
-        self.context = context
+    def __init__(self, hass: HomeAssistant | None = None, context=None) -> None:
+        # The flow manager assigns hass/context itself when created via async_get_options_flow.
+        if hass is not None:
+            self.hass = hass
+        if context is not None:
+            self.context = context
 
     async def async_step_init(self, user_input=None):
         errors = {}
@@ -110,6 +164,9 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     user_input[CONF_TRACKING_CODE] = _validate_code(user_input.get(CONF_TRACKING_CODE, ""))
                 except vol.Invalid:
                     errors[CONF_TRACKING_CODE] = "invalid_code"
+            elif mode == MODE_IMAP:
+                if not user_input.get(CONF_IMAP_ENTRY_ID):
+                    errors[CONF_IMAP_ENTRY_ID] = "required"
             else:
                 ent = user_input.get(CONF_CODE_ENTITY, "")
                 if not ent:
@@ -127,16 +184,29 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
 
         schema = vol.Schema(
             {
-                vol.Required(CONF_MODE, default=current.get(CONF_MODE, MODE_ENTITY)): vol.In([MODE_ENTITY, MODE_MANUAL]),
+                vol.Required(CONF_MODE, default=current.get(CONF_MODE, MODE_ENTITY)): vol.In([MODE_ENTITY, MODE_MANUAL, MODE_IMAP]),
                 vol.Optional(CONF_POLL_INTERVAL, default=int(current.get(CONF_POLL_INTERVAL, DEFAULT_POLL_INTERVAL))): vol.All(int, vol.Range(min=10, max=300)),
                 vol.Optional(CONF_RETENTION_HOURS, default=int(current.get(CONF_RETENTION_HOURS, DEFAULT_RETENTION_HOURS))): vol.All(int, vol.Range(min=1, max=48)),
                 vol.Optional(CONF_INCLUDE_DESTINATION, default=bool(current.get(CONF_INCLUDE_DESTINATION, DEFAULT_INCLUDE_DESTINATION))): bool,
+                # Adaptive polling policy: fast when the courier is close, slow while the order waits in the store
+                vol.Optional(CONF_ADAPTIVE_POLLING, default=bool(current.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING))): bool,
+                vol.Optional(CONF_NEAR_POLL_INTERVAL, default=int(current.get(CONF_NEAR_POLL_INTERVAL, DEFAULT_NEAR_POLL_INTERVAL))): vol.All(int, vol.Range(min=3, max=60)),
+                vol.Optional(CONF_IDLE_POLL_INTERVAL, default=int(current.get(CONF_IDLE_POLL_INTERVAL, DEFAULT_IDLE_POLL_INTERVAL))): vol.All(int, vol.Range(min=60, max=3600)),
+                # dodo_delivery_courier_nearby event once the courier is this close (m); 0 = off
+                vol.Optional(CONF_PROXIMITY_DISTANCE, default=int(current.get(CONF_PROXIMITY_DISTANCE, DEFAULT_PROXIMITY_DISTANCE))): vol.All(int, vol.Range(min=0, max=20000)),
+                # Add (and keep up to date) the bundled card in the dashboard resources
+                vol.Optional(CONF_REGISTER_CARD, default=bool(current.get(CONF_REGISTER_CARD, DEFAULT_REGISTER_CARD))): bool,
+                # Debugging: capture raw API responses to <config>/dodo_delivery_captures/
+                vol.Optional(CONF_RECORD_TRAFFIC, default=bool(current.get(CONF_RECORD_TRAFFIC, DEFAULT_RECORD_TRAFFIC))): bool,
+                vol.Optional(CONF_COLLECT_METRICS, default=bool(current.get(CONF_COLLECT_METRICS, DEFAULT_COLLECT_METRICS))): bool,
             }
         )
 
         mode = (user_input or current).get(CONF_MODE, MODE_ENTITY)
         if mode == MODE_MANUAL:
             schema = schema.extend({vol.Required(CONF_TRACKING_CODE, default=current.get(CONF_TRACKING_CODE, "")): str})
+        elif mode == MODE_IMAP:
+            schema = schema.extend(_imap_schema({**self.config_entry.data, **current}))
         else:
             schema = schema.extend(
                 {
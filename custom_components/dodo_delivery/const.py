@@ -3,24 +3,99 @@ DOMAIN = "dodo_delivery"
 CONF_MODE = "mode"
 MODE_MANUAL = "manual"
 MODE_ENTITY = "entity"
+MODE_IMAP = "imap"
 
 CONF_TRACKING_CODE = "tracking_code"
 CONF_CODE_ENTITY = "code_entity"
 
+# IMAP mode: codes come straight from the IMAP integration's imap_content events
+CONF_IMAP_ENTRY_ID = "imap_entry_id"
+CONF_IMAP_SUBJECT = "imap_subject"
+CONF_IMAP_REQUIRE_LINK = "imap_require_link"
+DEFAULT_IMAP_SUBJECT = "DODO"
+DEFAULT_IMAP_REQUIRE_LINK = True
+IMAP_EVENT = "imap_content"
+
 CONF_POLL_INTERVAL = "poll_interval"
 CONF_RETENTION_HOURS = "retention_hours"
 CONF_INCLUDE_DESTINATION = "include_destination"
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_NEAR_POLL_INTERVAL = "near_poll_interval"
+CONF_IDLE_POLL_INTERVAL = "idle_poll_interval"
+CONF_RECORD_TRAFFIC = "record_traffic"
+CONF_COLLECT_METRICS = "collect_metrics"
+CONF_PROXIMITY_DISTANCE = "proximity_distance"
+CONF_REGISTER_CARD = "register_card"
 
 DEFAULT_POLL_INTERVAL = 20  # seconds
 DEFAULT_RETENTION_HOURS = 12
 DEFAULT_INCLUDE_DESTINATION = False
+DEFAULT_ADAPTIVE_POLLING = True
+DEFAULT_NEAR_POLL_INTERVAL = 5  # seconds, courier about to arrive
+DEFAULT_IDLE_POLL_INTERVAL = 600  # seconds, order still waiting in the store
+DEFAULT_RECORD_TRAFFIC = False
+DEFAULT_COLLECT_METRICS = False
+DEFAULT_PROXIMITY_DISTANCE = 0  # meters, 0 = no courier_nearby event
+DEFAULT_REGISTER_CARD = False
+
+# Tracking codes followed by one entry (manual list, code entity or emails); extras are ignored
+MAX_CODES_PER_ENTRY = 10
+
+# Domain-wide poller limits (shared by every config entry)
+MAX_CONCURRENT_POLLS = 4
+MAX_POLLS_PER_SECOND = 5
+
+# Per-entry persistent cache (detail payload + last snapshot), see coordinator.async_restore
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 30  # seconds
+
+# Opt-in traffic capture: <config>/dodo_delivery_captures/<CODE>.jsonl.gz
+CAPTURE_DIR = "dodo_delivery_captures"
+CAPTURE_FLUSH_EVERY = 20  # records buffered before a write
+
+SERVICE_REPLAY_CAPTURE = "replay_capture"
+
+# Bus events, fired on transitions only (not on every poll or GPS update)
+EVENT_STATUS_CHANGED = f"{DOMAIN}_status_changed"
+EVENT_COURIER_NEARBY = f"{DOMAIN}_courier_nearby"
+
+# Completed deliveries, one JSON line each: <config>/dodo_delivery_archive.jsonl
+ARCHIVE_FILE = "dodo_delivery_archive.jsonl"
+# New archive records are pushed to the long-term statistics together after this delay
+STATISTICS_BATCH_DELAY = 60  # seconds
+SERVICE_IMPORT_STATISTICS = "import_statistics"
+
+# Bundled card: www/ is served under this path, the card with a content hash (?v=) for caching
+CARD_URL_PATH = f"/{DOMAIN}"
+CARD_FILE = "dodo-delivery-card.js"
 
 API_BASE = "https://api.gaia.delivery"
 DETAIL_PATH = "/order-tracking/orders/{code}/detail"
 STATUS_PATH = "/order-tracking/orders/{code}/status"
 
+# Integration-owned connection pool for the Gaia API
+HTTP_CONNECTIONS_PER_HOST = 8
+HTTP_KEEPALIVE_TIMEOUT = 30  # seconds
+HTTP_DNS_CACHE_TTL = 300  # seconds
+HTTP_CONNECT_TIMEOUT = 5  # seconds
+HTTP_READ_TIMEOUT = 10  # seconds
+# 2xx responses are reused by every caller for this long (below the shortest poll interval)
+RESPONSE_CACHE_TTL = 2.0  # seconds
+# Burst of code entity changes (e.g. an automation rewriting the helper) -> one refresh
+CODE_CHANGE_COOLDOWN = 1.0  # seconds
+
+# Failure handling: jittered exponential backoff per entry, circuit breaker per API host
+BACKOFF_MAX = 900  # seconds
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 60  # seconds before a single probe request is let through
+
+# Courier track kept per tracking code (ring buffer + simplified polyline)
+TRACK_CAPACITY = 720  # fixes; ~4h at 20s polling
+TRACK_SIMPLIFY_TOLERANCE_M = 15.0
+
 ATTR_TRACKING_CODE = "tracking_code"
 ATTR_ACTIVE = "active"
 ATTR_REASON = "reason"
 ATTR_LAST_UPDATE = "last_update"
 ATTR_LAST_SEEN_STATUS = "last_seen_status"
+ATTR_POLL_INTERVAL = "poll_interval"
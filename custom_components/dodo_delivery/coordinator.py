@@ -1,47 +1,128 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Callable
 from datetime import datetime, timedelta
 import logging
+import math
+from pathlib import Path
+import time
 from typing import Any
 
-import aiohttp
-
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.util import dt as dt_util
 
+from .api import UNCHANGED, CircuitOpenError, GaiaApi, GaiaApiError
+from .archive import DeliveryArchive, archive_record
+from .fleet import FleetIndex, FleetItem
+from .capture import ReplayApi, TrafficRecorder, load_capture
+from .resilience import backoff_delay
 from .const import (
-    API_BASE,
-    DETAIL_PATH,
-    STATUS_PATH,
     DOMAIN,
     CONF_MODE,
     MODE_MANUAL,
     MODE_ENTITY,
+    MODE_IMAP,
     CONF_TRACKING_CODE,
     CONF_CODE_ENTITY,
     CONF_RETENTION_HOURS,
     DEFAULT_RETENTION_HOURS,
     CONF_INCLUDE_DESTINATION,
     DEFAULT_INCLUDE_DESTINATION,
+    CONF_POLL_INTERVAL,
+    DEFAULT_POLL_INTERVAL,
+    CONF_ADAPTIVE_POLLING,
+    DEFAULT_ADAPTIVE_POLLING,
+    CONF_NEAR_POLL_INTERVAL,
+    DEFAULT_NEAR_POLL_INTERVAL,
+    CONF_IDLE_POLL_INTERVAL,
+    DEFAULT_IDLE_POLL_INTERVAL,
+    STORAGE_VERSION,
+    STORAGE_SAVE_DELAY,
+    MAX_CODES_PER_ENTRY,
+    CAPTURE_DIR,
+    CONF_RECORD_TRAFFIC,
+    DEFAULT_RECORD_TRAFFIC,
+    CONF_COLLECT_METRICS,
+    DEFAULT_COLLECT_METRICS,
+    CONF_PROXIMITY_DISTANCE,
+    DEFAULT_PROXIMITY_DISTANCE,
+    EVENT_STATUS_CHANGED,
+    EVENT_COURIER_NEARBY,
     ATTR_TRACKING_CODE,
     ATTR_ACTIVE,
     ATTR_REASON,
     ATTR_LAST_UPDATE,
     ATTR_LAST_SEEN_STATUS,
 )
-from .helpers import extract_code
+from .helpers import extract_codes
+from .poller import DodoDeliveryPoller
+from .scheduler import PollPolicy, compute_poll_interval, courier_distance_m
+from .track import CourierTrack, Fix
+from .eta import EtaEstimate, estimate_arrival
+from .model import DeliverySnapshot
+from .metrics import EntryMetrics
 
 _LOGGER = logging.getLogger(__name__)
 
 FINISHED_STATUSES = {"FINISHED", "DELIVERED"}
+# Statuses after which nothing changes any more: polling stops and retention starts
+TERMINAL_STATUSES = FINISHED_STATUSES | {"CANCELLED", "FAILED"}
+# Inactive reasons after which an IMAP code is forgotten
+EXPIRED_REASONS = ("expired_after_finished", "expired_not_found")
+
+# Courier fixes handed to the ETA engine (it only looks at the recent ones)
+SPEED_FIX_COUNT = 12
+
+# Coordinator state a replay works on its own copy of, put back when it ends
+_REPLAY_ISOLATED = (
+    "_current_code",
+    "_finished_at",
+    "_last_status",
+    "_nearby_fired",
+    "_detail_cache",
+    "_validators",
+    "_body_hashes",
+    "_fingerprint",
+    "poll_interval",
+    "last_checked",
+    "track",
+    "eta",
+    "_eta_inputs",
+    "stats",
+    "metrics",
+    "consecutive_failures",
+    "retry_at",
+)
+
 
 def _now_utc() -> datetime:
     return dt_util.utcnow()
 
+class _BackingOff(UpdateFailed):
+    """Refresh refused locally because the entry is still in its backoff window."""
+
+
+def _fingerprint(data: dict[str, Any]) -> tuple[Any, ...]:
+    """What a change is judged on: everything but the update time.
+
+    The snapshot only holds the fields the integration uses, so volatile API
+    fields (server time etc.) never count as a change.
+    """
+    return (
+        data.get(ATTR_ACTIVE),
+        data.get(ATTR_REASON),
+        data.get(ATTR_TRACKING_CODE),
+        data.get(ATTR_LAST_SEEN_STATUS),
+        data.get("snapshot"),
+    )
+
 def _parse_iso(iso: str | None) -> datetime | None:
     if not iso:
         return None
@@ -53,151 +134,918 @@ def _parse_iso(iso: str | None) -> datetime | None:
 
 
 class DodoDeliveryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
-    """Fetches DODO/Gaia order detail and exposes a single structured payload."""
+    """Fetches DODO/Gaia order detail and exposes a single structured payload.
+
+    The entry coordinator follows the first tracking code of the entry; every
+    further code gets a child coordinator with a fixed `code`, its own device
+    and entities, polled through the same shared poller.
+    """
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, update_interval: timedelta) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        update_interval: timedelta,
+        poller: DodoDeliveryPoller,
+        api: GaiaApi,
+        archive: DeliveryArchive | None = None,
+        fleet: FleetIndex | None = None,
+        code: str | None = None,
+    ) -> None:
+        # No own timer: the domain-wide poller decides when this entry is refreshed.
         super().__init__(
             hass,
             _LOGGER,
-            name=f"{DOMAIN}:{entry.title}",
-            update_interval=update_interval,
+            name=f"{DOMAIN}:{entry.title}" + (f":{code}" if code else ""),
+            update_interval=None,
+            # Listeners (and so state writes) only fire when the payload object changes.
+            always_update=False,
         )
         self.entry = entry
-        self._session = async_get_clientsession(hass)
+        self._poller = poller
+        self.api = api
+        # Completed deliveries are appended here once, when first seen finished.
+        self.archive = archive
+        # Cross-entry summary; fed from this coordinator's own updates only.
+        self.fleet = fleet
+        if fleet is not None:
+            self.async_add_listener(self._update_fleet)
+        # Fixed code of a child coordinator; None for the entry coordinator.
+        self.code = code
+        self.children: dict[str, DodoDeliveryCoordinator] = {}
+        # Codes whose retention ended; not re-created while they stay in the source.
+        self._retired: set[str] = set()
+        self._child_listeners: list[Callable[[DodoDeliveryCoordinator], None]] = []
+        self._devices_checked = False
+        # IMAP mode: codes received by email, oldest first, persisted across restarts.
+        self._imap_codes: list[str] = []
+        # ...and when each arrived; children share the entry coordinator's dict.
+        self._imap_added: dict[str, datetime] = {}
+        self._imap_store: Store[dict[str, Any]] | None = (
+            Store(hass, STORAGE_VERSION, f"{self.storage_key(entry.entry_id)}.imap")
+            if code is None and self._mode == MODE_IMAP
+            else None
+        )
         self._finished_at: datetime | None = None
         self._last_status: str | None = None
+        # The courier_nearby event fires once per tracking code.
+        self._nearby_fired = False
         self._current_code: str | None = None
         self._detail_cache: dict[str, Any] | None = None
+        self._base_interval = update_interval
+        self._expiry_unsub: CALLBACK_TYPE | None = None
+        # Interval chosen by the adaptive scheduler for the next poll (None = not polling).
+        self.poll_interval: int | None = int(update_interval.total_seconds())
+        # Last time a poll completed, changed or not; kept off the main entity on purpose.
+        self.last_checked: datetime | None = None
+        self._fingerprint: tuple[Any, ...] | None = None
+        self._check_listeners: list[Callable[[], None]] = []
+        # Courier fixes of the current tracking code (served over the websocket API)
+        self.track = CourierTrack()
+        self._track_listeners: list[Callable[[Fix | None], None]] = []
+        # Local ETA, recomputed only on a new fix or when the API time window changes
+        self.eta: EtaEstimate | None = None
+        self._eta_inputs: tuple[Any, ...] | None = None
+        # Conditional HTTP state per URL: (ETag, Last-Modified) and digest of the last parsed body.
+        self._validators: dict[str, tuple[str | None, str | None]] = {}
+        self._body_hashes: dict[str, bytes] = {}
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, self.storage_key(entry.entry_id, code))
+        self.stats: dict[str, int] = {
+            "polls": 0,
+            "http_requests": 0,
+            "not_modified": 0,
+            "unchanged_body": 0,
+            "short_circuited": 0,
+            "failures": 0,
+            "retries": 0,
+            "skipped": 0,
+            "unchanged": 0,
+            "detail_cache_hits": 0,
+            "detail_cache_misses": 0,
+            "bytes_received": 0,
+            "coalesced": 0,
+        }
+        # Timing histograms, only when enabled in the options (None keeps the hot path bare).
+        self.metrics: EntryMetrics | None = (
+            EntryMetrics() if self.entry.options.get(CONF_COLLECT_METRICS, DEFAULT_COLLECT_METRICS) else None
+        )
+        # Opt-in capture of raw responses for the current code; replay swaps in a ReplayApi.
+        self._recorder: TrafficRecorder | None = None
+        self.replaying = False
+        # Recorded time of the status response being replayed (None when live).
+        self._replay_clock: datetime | None = None
+        # Backoff state: consecutive failed polls and the earliest time to try again.
+        self.consecutive_failures = 0
+        self.retry_at: datetime | None = None
 
-    def _get_tracking_code(self) -> str | None:
-        mode = self.entry.options.get(CONF_MODE, self.entry.data.get(CONF_MODE, MODE_MANUAL))
+    @staticmethod
+    def storage_key(entry_id: str, code: str | None = None) -> str:
+        return f"{DOMAIN}.{entry_id}" + (f".{code}" if code else "")
+
+    @property
+    def unique_prefix(self) -> str:
+        """Unique id stem of this coordinator's entities."""
+        return f"{DOMAIN}_{self.entry.entry_id}" + (f"_{self.code}" if self.code else "")
+
+    @property
+    def device_identifier(self) -> tuple[str, str]:
+        return (DOMAIN, self.entry.entry_id + (f"_{self.code}" if self.code else ""))
+
+    @property
+    def _mode(self) -> str:
+        return self.entry.options.get(CONF_MODE, self.entry.data.get(CONF_MODE, MODE_MANUAL))
+
+    def tracking_codes(self) -> list[str]:
+        """All codes the entry follows, from the manual list, the code entity or emails."""
+        mode = self._mode
+        if mode == MODE_IMAP:
+            return self._imap_codes[:MAX_CODES_PER_ENTRY]
         if mode == MODE_ENTITY:
             ent_id = self.entry.options.get(CONF_CODE_ENTITY, self.entry.data.get(CONF_CODE_ENTITY))
             if not ent_id:
-                return None
+                return []
             st = self.hass.states.get(ent_id)
-            return extract_code(st.state if st else None)
-        # manual
-        code = self.entry.options.get(CONF_TRACKING_CODE, self.entry.data.get(CONF_TRACKING_CODE))
-        return extract_code(code)
+            text = st.state if st else None
+        else:
+            text = self.entry.options.get(CONF_TRACKING_CODE, self.entry.data.get(CONF_TRACKING_CODE))
+        return extract_codes(text)[:MAX_CODES_PER_ENTRY]
+
+    def _get_tracking_code(self) -> str | None:
+        if self.code is not None:
+            return self.code
+        codes = self.tracking_codes()
+        return codes[0] if codes else None
+
+    @property
+    def detail_cache_hit_ratio(self) -> float | None:
+        """Share of polls served from the cached detail document (0..1)."""
+        hits = self.stats["detail_cache_hits"]
+        total = hits + self.stats["detail_cache_misses"]
+        return hits / total if total else None
+
+    def _include_destination(self) -> bool:
+        return bool(self.entry.options.get(CONF_INCLUDE_DESTINATION, DEFAULT_INCLUDE_DESTINATION))
+
+    def _poll_policy(self) -> PollPolicy:
+        opts = self.entry.options
+        return PollPolicy(
+            base=int(opts.get(CONF_POLL_INTERVAL, DEFAULT_POLL_INTERVAL)),
+            near=int(opts.get(CONF_NEAR_POLL_INTERVAL, DEFAULT_NEAR_POLL_INTERVAL)),
+            idle=int(opts.get(CONF_IDLE_POLL_INTERVAL, DEFAULT_IDLE_POLL_INTERVAL)),
+            adaptive=bool(opts.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING)),
+        )
+
+    async def async_restore(self) -> bool:
+        """Load the persisted snapshot for the current tracking code.
+
+        Returns True when the entry could be populated from disk, so the caller
+        can run the first network refresh in the background.
+        """
+        if self._imap_store is not None:
+            stored_codes = await self._imap_store.async_load() or {}
+            if isinstance(stored_codes, list):
+                # Written before arrival times were kept: their window starts now.
+                stored_codes = {"codes": stored_codes}
+            self._imap_codes = list(stored_codes.get("codes", []))
+            added = stored_codes.get("added", {})
+            now = _now_utc()
+            self._imap_added.update({code: _parse_iso(added.get(code)) or now for code in self._imap_codes})
+        stored = await self._store.async_load()
+        code = self._get_tracking_code()
+        if not stored or not code or stored.get("code") != code or not stored.get("data"):
+            return False
+        if "snapshot" not in stored["data"]:
+            # Written before snapshots existed; the first poll rebuilds it.
+            return False
+
+        retention_hours = int(self.entry.options.get(CONF_RETENTION_HOURS, DEFAULT_RETENTION_HOURS))
+        self._current_code = code
+        self._start_recording(code)
+        self._detail_cache = stored.get("detail")
+        self._last_status = stored.get("last_status")
+        self._nearby_fired = bool(stored.get("nearby_fired"))
+        self._finished_at = _parse_iso(stored.get("finished_at"))
+        if self._retention_expired(_now_utc(), retention_hours):
+            # Stale: the delivery expired while HA was down.
+            self._finished_at = None
+            self._detail_cache = None
+            self._current_code = None
+            await self._store.async_remove()
+            return False
+
+        data = dict(stored["data"])
+        if data["snapshot"] is not None:
+            data["snapshot"] = DeliverySnapshot(data["snapshot"], self._include_destination())
+        self._fingerprint = _fingerprint(data)
+        if self._finished_at is not None:
+            self._freeze_finished(retention_hours)
+        self.async_set_updated_data(data)
+        return True
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+
+    @callback
+    def _data_to_store(self) -> dict[str, Any]:
+        data = dict(self.data or {})
+        snapshot = data.get("snapshot")
+        data["snapshot"] = snapshot.source if snapshot is not None else None
+        return {
+            "code": self._current_code,
+            "detail": self._detail_cache,
+            "data": data,
+            "last_status": self._last_status,
+            "nearby_fired": self._nearby_fired,
+            "finished_at": self._finished_at.isoformat() if self._finished_at else None,
+        }
 
     def _retention_expired(self, now: datetime, retention_hours: int) -> bool:
         if not self._finished_at:
             return False
         return now >= (self._finished_at + timedelta(hours=retention_hours))
 
+    def _not_found(self, code: str, now: datetime, retention_hours: int) -> dict[str, Any]:
+        """Payload for a code the API doesn't know; an emailed one is given up after retention.
+
+        The window counts from the email's arrival, so a code that never shows
+        up doesn't keep one of the entry's slots forever.
+        """
+        added = self._imap_added.get(code)
+        if added is not None and now >= added + timedelta(hours=retention_hours):
+            self._suspend_polling()
+            return self._inactive_payload("expired_not_found", code, now)
+        return self._inactive_payload("not_found", code, now)
+
+    def _inactive_payload(self, reason: str, code: str | None, now: datetime) -> dict[str, Any]:
+        return {
+            ATTR_ACTIVE: False,
+            ATTR_REASON: reason,
+            ATTR_TRACKING_CODE: code,
+            ATTR_LAST_UPDATE: now.isoformat(),
+            ATTR_LAST_SEEN_STATUS: self._last_status,
+            "snapshot": None,
+        }
+
+    def _cancel_expiry(self) -> None:
+        if self._expiry_unsub is not None:
+            self._expiry_unsub()
+            self._expiry_unsub = None
+
+    def _suspend_polling(self) -> None:
+        """Stop periodic polling; only an explicit refresh wakes the coordinator."""
+        self.poll_interval = None
+
+    def _resume_polling(self) -> None:
+        if self.poll_interval is None:
+            self.poll_interval = int(self._base_interval.total_seconds())
+
+    def _set_poll_interval(self, seconds: int) -> None:
+        self.poll_interval = seconds
+
+    @callback
+    def async_add_check_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        """Listen for every completed poll, including ones that changed nothing."""
+        self._check_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._check_listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_add_track_listener(self, fix_callback: Callable[[Fix | None], None]) -> Callable[[], None]:
+        """Listen for every courier fix appended to the track (None: track was reset)."""
+        self._track_listeners.append(fix_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._track_listeners.remove(fix_callback)
+
+        return remove_listener
+
+    def _record_fix(self, snapshot: DeliverySnapshot, now: datetime) -> bool:
+        """Append the courier position to the track; True if it was a new fix."""
+        if not snapshot.has_agent_position:
+            return False
+        if not self.track.append(now.timestamp(), snapshot.agent_latitude, snapshot.agent_longitude):
+            return False
+        self._notify_track(self.track.last())
+        return True
+
+    def _update_eta(self, snapshot: DeliverySnapshot, now: datetime, new_fix: bool) -> None:
+        """Recompute the ETA on an accepted fix or a changed time window.
+
+        The snapshot keeps the drop point even when it is not published.
+        """
+        inputs = (snapshot.expected_start, snapshot.required_end, snapshot.drop_latitude, snapshot.drop_longitude)
+        if not new_fix and inputs == self._eta_inputs:
+            return
+        self._eta_inputs = inputs
+        self.eta = estimate_arrival(
+            now,
+            self.track.recent(SPEED_FIX_COUNT),
+            (snapshot.drop_latitude, snapshot.drop_longitude) if snapshot.has_destination else None,
+            snapshot.expected_start,
+            snapshot.required_end,
+        )
+
+    def _replay_event_data(self) -> dict[str, Any]:
+        # Replayed events carry the live entry's tracking code; the flag tells them apart.
+        return {"replay": True} if self.replaying else {}
+
+    def _fire_transition_events(self, code: str, snapshot: DeliverySnapshot, finished: bool, now: datetime) -> None:
+        """Fire the bus events for what changed since the previous snapshot.
+
+        Called with `_last_status` still holding the previous status; GPS-only
+        updates fire nothing.
+        """
+        if snapshot.status != self._last_status:
+            source = snapshot.source
+            self.hass.bus.async_fire(
+                EVENT_STATUS_CHANGED,
+                {
+                    "entry_id": self.entry.entry_id,
+                    "tracking_code": code,
+                    # None for the first status seen for a tracking code
+                    "old_status": self._last_status,
+                    "new_status": snapshot.status,
+                    "changed_at": now.isoformat(),
+                    "expected_start": source.get("expectedStart"),
+                    "required_end": source.get("requiredEnd"),
+                    "finished": source.get("finished") or source.get("delivered"),
+                    **self._replay_event_data(),
+                },
+            )
+
+        threshold = int(self.entry.options.get(CONF_PROXIMITY_DISTANCE, DEFAULT_PROXIMITY_DISTANCE))
+        if not threshold or self._nearby_fired or finished:
+            return
+        distance = courier_distance_m(snapshot)
+        if distance is None or distance > threshold:
+            return
+        self._nearby_fired = True
+        self.hass.bus.async_fire(
+            EVENT_COURIER_NEARBY,
+            {
+                "entry_id": self.entry.entry_id,
+                "tracking_code": code,
+                "status": snapshot.status,
+                "distance_m": round(distance),
+                "threshold_m": threshold,
+                "at": now.isoformat(),
+                "eta": self.eta.arrival.isoformat() if self.eta is not None and self.eta.arrival else None,
+                **self._replay_event_data(),
+            },
+        )
+
+    @callback
+    def _update_fleet(self) -> None:
+        data = self.data or {}
+        snapshot = data.get("snapshot") if data.get(ATTR_ACTIVE) else None
+        if snapshot is None:
+            self.fleet.async_update(self.unique_prefix, None)
+            return
+        arrival = self.eta.arrival if self.eta is not None and self.eta.arrival else snapshot.expected_start
+        self.fleet.async_update(
+            self.unique_prefix, FleetItem(data[ATTR_TRACKING_CODE], snapshot.status_key or "unknown", arrival)
+        )
+
+    def _notify_track(self, fix: Fix | None) -> None:
+        if self.replaying:
+            # Subscribers follow the live delivery; the replayed fixes stay in the replay's track.
+            return
+        for fix_callback in list(self._track_listeners):
+            fix_callback(fix)
+
+    @callback
+    def _async_refresh_finished(self) -> None:
+        """Hand the next poll time to the shared poller after every refresh."""
+        if not self.replaying:
+            interval = self.poll_interval
+            if self.retry_at is not None and interval is not None:
+                # Backing off: aim at the existing retry time, so triggers refused
+                # inside the window (_BackingOff) don't push it back each time.
+                interval = max(0, math.ceil((self.retry_at - _now_utc()).total_seconds()))
+            self._poller.async_schedule(self, interval)
+        if self.code is None:
+            self._sync_children()
+        for update_callback in list(self._check_listeners):
+            update_callback()
+
+    @callback
+    def async_add_child_listener(self, child_callback: Callable[[DodoDeliveryCoordinator], None]) -> Callable[[], None]:
+        """Listen for child coordinators created for additional tracking codes."""
+        self._child_listeners.append(child_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._child_listeners.remove(child_callback)
+
+        return remove_listener
+
+    @callback
+    def async_add_codes(self, codes: list[str]) -> None:
+        """IMAP mode: start tracking codes found in an email (known ones are ignored)."""
+        new = [code for code in codes if code not in self._imap_codes]
+        if not new or self._imap_store is None:
+            return
+        first = self._get_tracking_code()
+        # Newest codes win when over the limit.
+        self._imap_codes = (self._imap_codes + new)[-MAX_CODES_PER_ENTRY:]
+        now = _now_utc()
+        added = {code: self._imap_added.get(code, now) for code in self._imap_codes}
+        self._imap_added.clear()
+        self._imap_added.update(added)
+        self._save_imap_codes()
+        if self._get_tracking_code() == first:
+            # Only additional codes: the children start through the poller, no entry refresh needed.
+            self._sync_children()
+        else:
+            self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def _forget_code(self, code: str | None) -> None:
+        """IMAP mode: drop a code after retention (ended or never found); the next one takes its place."""
+        if self._imap_store is None or code not in self._imap_codes:
+            return
+        self._imap_codes.remove(code)
+        self._imap_added.pop(code, None)
+        self._save_imap_codes()
+        if code == self._current_code:
+            self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def _save_imap_codes(self) -> None:
+        self._imap_store.async_delay_save(
+            lambda: {
+                "codes": self._imap_codes,
+                "added": {code: self._imap_added[code].isoformat() for code in self._imap_codes if code in self._imap_added},
+            },
+            STORAGE_SAVE_DELAY,
+        )
+
+    @callback
+    def _sync_children(self) -> None:
+        """Create/remove child coordinators so they match the entry's extra codes."""
+        extra = self.tracking_codes()[1:]
+        self._retired &= set(extra)
+        wanted = [code for code in extra if code not in self._retired]
+        changed = False
+        for code in list(self.children):
+            if code not in wanted:
+                self._remove_child(code)
+                changed = True
+        for code in wanted:
+            if code in self.children:
+                continue
+            child = DodoDeliveryCoordinator(
+                self.hass, self.entry, self._base_interval, self._poller, self.api, self.archive, self.fleet, code
+            )
+            child._imap_added = self._imap_added
+            self.children[code] = child
+            child.async_add_listener(lambda code=code: self._handle_child_update(code))
+            self.hass.async_create_task(self._async_start_child(child))
+            for child_callback in list(self._child_listeners):
+                child_callback(child)
+            changed = True
+        if changed or not self._devices_checked:
+            # Also once after startup: codes may have left the source while HA was down.
+            self._devices_checked = True
+            self._remove_stale_devices()
+
+    async def _async_start_child(self, child: DodoDeliveryCoordinator) -> None:
+        # The first fetch goes through the poller, so a burst of new codes stays within its limits.
+        await child.async_restore()
+        if self.children.get(child.code) is child:
+            self._poller.async_schedule(child, 0)
+
+    @callback
+    def _handle_child_update(self, code: str) -> None:
+        child = self.children.get(code)
+        if child is not None and child.data and child.data.get(ATTR_REASON) in EXPIRED_REASONS:
+            # Over (or never found) and past retention: stop tracking it until the code leaves the source.
+            self._retired.add(code)
+            self._remove_child(code)
+            self._remove_stale_devices()
+            self._forget_code(code)
+
+    @callback
+    def _remove_child(self, code: str) -> None:
+        child = self.children.pop(code)
+        self.hass.async_create_task(child.async_shutdown())
+        self.hass.async_create_task(child._store.async_remove())
+
+    def _adopt_child(self, child: DodoDeliveryCoordinator) -> None:
+        """Take over the delivery a child was following (its code became the first one).
+
+        Caches, finish time, last status, track and ETA move over, so nothing is
+        refetched from scratch and no status event fires twice; the child and its
+        device go away.
+        """
+        del self.children[child.code]
+        self._cancel_expiry()
+        self._current_code = child.code
+        self._finished_at = child._finished_at
+        self._last_status = child._last_status
+        self._nearby_fired = child._nearby_fired
+        self._detail_cache = child._detail_cache
+        self._validators = child._validators
+        self._body_hashes = child._body_hashes
+        self.consecutive_failures = 0
+        self.retry_at = None
+        self._start_recording(child.code)
+        # Subscribers drop the old code's trail, then get the adopted track's fixes.
+        self._notify_track(None)
+        self.track = child.track
+        self.eta = child.eta
+        self._eta_inputs = child._eta_inputs
+        self.hass.async_create_task(child.async_shutdown())
+        self.hass.async_create_task(child._store.async_remove())
+        self._remove_stale_devices()
+
+    @callback
+    def _remove_stale_devices(self) -> None:
+        """Drop devices (and so entities) of codes that no longer have a child."""
+        registry = dr.async_get(self.hass)
+        keep = {self.device_identifier, *(child.device_identifier for child in self.children.values())}
+        for device in dr.async_entries_for_config_entry(registry, self.entry.entry_id):
+            if not device.identifiers & keep:
+                registry.async_remove_device(device.id)
+
+    def _freeze_finished(self, retention_hours: int) -> None:
+        """Enter terminal state: no more polling, one callback when retention ends."""
+        self._suspend_polling()
+        self.eta = None
+        self._cancel_expiry()
+        expires_at = self._finished_at + timedelta(hours=retention_hours)
+        self._expiry_unsub = async_track_point_in_utc_time(self.hass, self._handle_retention_expired, expires_at)
+
+    @callback
+    def _handle_retention_expired(self, now: datetime) -> None:
+        self._expiry_unsub = None
+        self._poller.async_remove(self)
+        data = self._inactive_payload("expired_after_finished", self._current_code, now)
+        self._fingerprint = _fingerprint(data)
+        self.async_set_updated_data(data)
+        # Evict: nothing worth restoring after retention ended.
+        self.hass.async_create_task(self._store.async_remove())
+        self._forget_code(self._current_code)
+
+    @callback
+    def async_apply_options(self) -> None:
+        """Apply changed options in place, keeping the caches, finish time and track.
+
+        Mode and code source changes need an entry reload instead (see __init__).
+        """
+        now = _now_utc()
+        opts = self.entry.options
+        self._base_interval = timedelta(seconds=int(opts.get(CONF_POLL_INTERVAL, DEFAULT_POLL_INTERVAL)))
+        if not opts.get(CONF_COLLECT_METRICS, DEFAULT_COLLECT_METRICS):
+            self.metrics = None
+        elif self.metrics is None:
+            self.metrics = EntryMetrics()
+        if self._current_code is not None and (self._recorder is not None) != bool(
+            opts.get(CONF_RECORD_TRAFFIC, DEFAULT_RECORD_TRAFFIC)
+        ):
+            self._start_recording(self._current_code)
+
+        # Destination privacy: rebuild the published attributes from the cached source.
+        snapshot = self.data.get("snapshot") if self.data else None
+        if snapshot is not None:
+            rebuilt = DeliverySnapshot(snapshot.source, self._include_destination())
+            if rebuilt != snapshot:
+                data = {**self.data, "snapshot": rebuilt}
+                self._fingerprint = _fingerprint(data)
+                self.async_set_updated_data(data)
+                self._async_schedule_save()
+                snapshot = rebuilt
+
+        if self._finished_at is not None:
+            # Retention counts from the known finish time, also when it got shorter.
+            retention_hours = int(opts.get(CONF_RETENTION_HOURS, DEFAULT_RETENTION_HOURS))
+            if self._expiry_unsub is not None:
+                if self._retention_expired(now, retention_hours):
+                    self._cancel_expiry()
+                    self._handle_retention_expired(now)
+                else:
+                    self._freeze_finished(retention_hours)
+        elif self.poll_interval is not None and self.retry_at is None and not self.replaying:
+            # Move the pending poll to the new interval instead of waiting for the old one.
+            interval = (
+                compute_poll_interval(snapshot, now, self._poll_policy())
+                if snapshot is not None
+                else int(self._base_interval.total_seconds())
+            )
+            self._set_poll_interval(interval)
+            self._poller.async_schedule(self, interval)
+
+        for child in list(self.children.values()):
+            child.async_apply_options()
+        if self.code is None:
+            # Manual mode: an edited code list takes effect right away.
+            if self._get_tracking_code() != self._current_code:
+                self.hass.async_create_task(self.async_request_refresh())
+            else:
+                self._sync_children()
+
+    async def async_shutdown(self) -> None:
+        for child in self.children.values():
+            await child.async_shutdown()
+        self._cancel_expiry()
+        self._poller.async_remove(self)
+        if self.fleet is not None:
+            self.fleet.async_update(self.unique_prefix, None)
+        if self._recorder is not None:
+            await self.hass.async_add_executor_job(self._recorder.write, self._recorder.take())
+        await super().async_shutdown()
+
+    def _start_recording(self, code: str) -> None:
+        """Point the capture at the file of a (new) tracking code, flushing the old one."""
+        self._flush_recording()
+        self._recorder = None
+        if self.entry.options.get(CONF_RECORD_TRAFFIC, DEFAULT_RECORD_TRAFFIC):
+            self._recorder = TrafficRecorder(Path(self.hass.config.path(CAPTURE_DIR, f"{code}.jsonl.gz")))
+
+    def _flush_recording(self) -> None:
+        if self._recorder is not None:
+            self.hass.async_add_executor_job(self._recorder.write, self._recorder.take())
+
+    async def async_replay(self, path: Path, speed: float = 1.0) -> int:
+        """Feed a capture file back through the normal update pipeline, without network.
+
+        One refresh per recorded status response, spaced like the recording
+        divided by `speed` (0 = as fast as possible). Returns the number of
+        refreshes. The replay gets its own track, ETA and stats, and track
+        subscribers don't see its fixes; afterwards the live delivery's state
+        and data are put back and the entry catches up from the live API.
+        Nothing is persisted meanwhile.
+        """
+        if self.replaying:
+            raise HomeAssistantError("A capture is already being replayed into this entry")
+        self.replaying = True
+        try:
+            records = await self.hass.async_add_executor_job(load_capture, path)
+        except BaseException:
+            self.replaying = False
+            raise
+        api = ReplayApi(records)
+        times = api.status_times()
+        live_api, self.api = self.api, api
+        # The live delivery's state; the replay runs on fresh copies, starting as a "new code".
+        live_state = {name: getattr(self, name) for name in _REPLAY_ISOLATED}
+        live_data = self.data
+        self._poller.async_remove(self)
+        self._cancel_expiry()
+        self._current_code = None
+        self._validators = {}
+        self._body_hashes = {}
+        self.track = CourierTrack()
+        self.eta = None
+        self._eta_inputs = None
+        self.stats = dict.fromkeys(self.stats, 0)
+        self.metrics = EntryMetrics() if self.metrics is not None else None
+        self.consecutive_failures = 0
+        try:
+            previous = None
+            for when in times:
+                if previous is not None and speed > 0:
+                    await asyncio.sleep((when - previous) / speed)
+                previous = when
+                self._replay_clock = dt_util.utc_from_timestamp(when)
+                # Recorded failures must not put the replay into a real backoff window.
+                self.retry_at = None
+                await self.async_refresh()
+        finally:
+            self.api = live_api
+            self.replaying = False
+            self._replay_clock = None
+            for name, value in live_state.items():
+                setattr(self, name, value)
+            if live_data is not None:
+                self.async_set_updated_data(live_data)
+            await self.async_request_refresh()
+        return len(times)
+
+    async def _async_get_json(self, url: str, kind: str) -> tuple[int, Any]:
+        """GET through the shared API with this entry's conditional request state.
+
+        Returns (http_status, payload); payload is UNCHANGED on 304 or when the
+        body hashes to the same digest as last time (JSON decoding is skipped).
+        Only requests this entry actually sent count as `http_requests`.
+        """
+        try:
+            result = await self.api.async_get_json(
+                url, kind, self._validators.get(url, (None, None)), self._body_hashes.get(url)
+            )
+        except GaiaApiError as err:
+            if not err.shared and not isinstance(err, CircuitOpenError):
+                self.stats["http_requests"] += 1
+            if self._recorder is not None and not self.replaying:
+                self._recorder.record_error(kind, str(err))
+            raise UpdateFailed(str(err)) from err
+
+        if self._recorder is not None and not self.replaying:
+            self._recorder.record(kind, result)
+            if self._recorder.should_flush:
+                self._flush_recording()
+
+        if result.shared:
+            # Answered by a request another trigger or entry already had in flight (or just made).
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["http_requests"] += 1
+            if result.body is not None:
+                self.stats["bytes_received"] += len(result.body)
+        if self.metrics is not None:
+            self.metrics.observe("request", result.elapsed)
+            if result.decode:
+                self.metrics.observe("decode", result.decode)
+
+        if result.payload is UNCHANGED:
+            self.stats["not_modified" if result.status == 304 else "unchanged_body"] += 1
+        elif result.payload is not None:
+            self._body_hashes[url] = result.digest
+            if result.validators != (None, None):
+                self._validators[url] = result.validators
+        return result.status, result.payload
+
+    def _register_failure(self, err: UpdateFailed) -> None:
+        """Back off exponentially (with jitter), honoring Retry-After / an open breaker."""
+        self.consecutive_failures += 1
+        self.stats["failures"] += 1
+        cause = err.__cause__
+        retry_after = cause.retry_after if isinstance(cause, GaiaApiError) else None
+        delay = backoff_delay(self.consecutive_failures, self._base_interval.total_seconds(), retry_after=retry_after)
+        self.retry_at = _now_utc() + timedelta(seconds=delay)
+        self.poll_interval = int(delay)
+
+    def _register_success(self) -> None:
+        if self.consecutive_failures:
+            self.stats["retries"] += self.consecutive_failures
+        self.consecutive_failures = 0
+        self.retry_at = None
+
     async def _async_update_data(self) -> dict[str, Any]:
+        self.stats["polls"] += 1
+        try:
+            data = await self._async_fetch_data()
+        except _BackingOff:
+            self.stats["skipped"] += 1
+            raise
+        except UpdateFailed as err:
+            self._register_failure(err)
+            raise
+        self._register_success()
+        self.last_checked = _now_utc()
+        if data is self.data:
+            return data
+        # Unchanged poll: hand back the previous object so no state is written.
+        fingerprint = _fingerprint(data)
+        if self.data is not None and fingerprint == self._fingerprint:
+            self.stats["unchanged"] += 1
+            return self.data
+        self._fingerprint = fingerprint
+        if self.replaying:
+            # Replayed deliveries never touch the live code's Store or IMAP list.
+            return data
+        if data.get(ATTR_ACTIVE):
+            self._async_schedule_save()
+        elif data.get(ATTR_REASON) == "no_tracking_code" or data.get(ATTR_REASON) in EXPIRED_REASONS:
+            self.hass.async_create_task(self._store.async_remove())
+            if data.get(ATTR_REASON) in EXPIRED_REASONS:
+                self._forget_code(data.get(ATTR_TRACKING_CODE))
+        return data
+
+    async def _async_fetch_data(self) -> dict[str, Any]:
         code = self._get_tracking_code()
         retention_hours = int(self.entry.options.get(CONF_RETENTION_HOURS, DEFAULT_RETENTION_HOURS))
-        include_destination = bool(self.entry.options.get(CONF_INCLUDE_DESTINATION, DEFAULT_INCLUDE_DESTINATION))
-        now = _now_utc()
+        # A replay runs on the capture's clock, so retention is judged like it was when recorded.
+        now = self._replay_clock or _now_utc()
 
         if not code:
-            return {
-                ATTR_ACTIVE: False,
-                ATTR_REASON: "no_tracking_code",
-                ATTR_TRACKING_CODE: None,
-                ATTR_LAST_UPDATE: now.isoformat(),
-                ATTR_LAST_SEEN_STATUS: self._last_status,
-                "detail": None,
-            }
+            # Nothing to track: stay idle until the code entity listener requests a refresh.
+            self._cancel_expiry()
+            self._suspend_polling()
+            return self._inactive_payload("no_tracking_code", None, now)
 
         # If tracking code changes (e.g., IMAP helper updated), reset internal state
         # so a previous delivery's "finished" retention can't leak into the new one.
-        if code != self._current_code:
+        child = self.children.get(code) if self.code is None else None
+        if code != self._current_code and child is not None:
+            # An extra code moved up to first place: carry on with its child's state.
+            self._adopt_child(child)
+        elif code != self._current_code:
             self._current_code = code
             self._finished_at = None
             self._last_status = None
+            self._nearby_fired = False
             self._detail_cache = None
+            self._validators.clear()
+            self._body_hashes.clear()
+            self.consecutive_failures = 0
+            self.retry_at = None
+            if not self.replaying:
+                self._start_recording(code)
+            self.track.clear()
+            self._notify_track(None)
+            self.eta = None
+            self._eta_inputs = None
+            self._cancel_expiry()
 
         if self._retention_expired(now, retention_hours):
-            return {
-                ATTR_ACTIVE: False,
-                ATTR_REASON: "expired_after_finished",
-                ATTR_TRACKING_CODE: code,
-                ATTR_LAST_UPDATE: now.isoformat(),
-                ATTR_LAST_SEEN_STATUS: self._last_status,
-                "detail": None,
-            }
+            self._cancel_expiry()
+            self._suspend_polling()
+            return self._inactive_payload("expired_after_finished", code, now)
+
+        # Terminal state: the snapshot is frozen and the expiry callback is pending,
+        # so an explicit refresh (e.g. the code entity being re-set) costs no requests.
+        if self._finished_at is not None and self._expiry_unsub is not None and self.data:
+            self.stats["skipped"] += 1
+            return self.data
+
+        # Extra triggers (code entity listener, manual refresh) must not cut a backoff short.
+        if self.retry_at is not None and now < self.retry_at:
+            raise _BackingOff(f"Backing off until {self.retry_at.isoformat()}")
+
+        self._resume_polling()
 
         # 1) DETAIL is mostly static; cache it to reduce load and avoid needless churn.
+        # 2) STATUS is dynamic and includes the courier live coordinates.
+        # On a new code both are needed, so they are requested concurrently.
+        detail_fetched = False
+        status_url = self.api.status_url(code)
         if self._detail_cache is None:
-            detail_url = f"{API_BASE}{DETAIL_PATH.format(code=code)}"
-            try:
-                async with self._session.get(detail_url, timeout=aiohttp.ClientTimeout(total=15)) as resp:
-                    if resp.status == 404:
-                        return {
-                            ATTR_ACTIVE: False,
-                            ATTR_REASON: "not_found",
-                            ATTR_TRACKING_CODE: code,
-                            ATTR_LAST_UPDATE: now.isoformat(),
-                            ATTR_LAST_SEEN_STATUS: self._last_status,
-                            "detail": None,
-                        }
-                    if resp.status >= 400:
-                        raise UpdateFailed(f"HTTP {resp.status}")
-                    self._detail_cache = await resp.json()
-            except asyncio.CancelledError:
-                raise
-            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
-                raise UpdateFailed(f"Request failed (detail): {err}") from err
-            except ValueError as err:
-                raise UpdateFailed(f"Invalid JSON (detail): {err}") from err
+            self.stats["detail_cache_misses"] += 1
+            (detail_status, detail), (http_status, status_payload) = await asyncio.gather(
+                self._async_get_json(self.api.detail_url(code), "detail"),
+                self._async_get_json(status_url, "status"),
+            )
+            if detail_status == 404:
+                return self._not_found(code, now, retention_hours)
+            if detail is not UNCHANGED:
+                self._detail_cache = detail
+                detail_fetched = True
+        else:
+            self.stats["detail_cache_hits"] += 1
+            http_status, status_payload = await self._async_get_json(status_url, "status")
+        if http_status == 404:
+            return self._not_found(code, now, retention_hours)
 
-        # 2) STATUS is dynamic and includes the courier live coordinates.
-        status_url = f"{API_BASE}{STATUS_PATH.format(code=code)}"
-        try:
-            async with self._session.get(status_url, timeout=aiohttp.ClientTimeout(total=15)) as resp:
-                if resp.status == 404:
-                    return {
-                        ATTR_ACTIVE: False,
-                        ATTR_REASON: "not_found",
-                        ATTR_TRACKING_CODE: code,
-                        ATTR_LAST_UPDATE: now.isoformat(),
-                        ATTR_LAST_SEEN_STATUS: self._last_status,
-                        "detail": None,
-                    }
-                if resp.status >= 400:
-                    raise UpdateFailed(f"HTTP {resp.status}")
-                status_payload = await resp.json()
-        except asyncio.CancelledError:
-            raise
-        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
-            raise UpdateFailed(f"Request failed (status): {err}") from err
-        except ValueError as err:
-            raise UpdateFailed(f"Invalid JSON (status): {err}") from err
+        if (
+            status_payload is UNCHANGED
+            and not detail_fetched
+            and self.data
+            and self.data.get(ATTR_ACTIVE)
+            and self.data.get("snapshot") is not None
+            and self.data.get(ATTR_TRACKING_CODE) == code
+        ):
+            # Same bytes as last time: no new snapshot, only move the schedule along.
+            self.stats["short_circuited"] += 1
+            self._set_poll_interval(compute_poll_interval(self.data["snapshot"], now, self._poll_policy()))
+            return self.data
+        if status_payload is UNCHANGED:
+            # Nothing to short-circuit against (e.g. previous result was inactive): refetch fully.
+            self._body_hashes.pop(status_url, None)
+            self._validators.pop(status_url, None)
+            http_status, status_payload = await self._async_get_json(status_url, "status")
+            if http_status == 404:
+                return self._not_found(code, now, retention_hours)
 
-        # 3) Merge: make a single payload so the sensor can read everything from one place.
-        payload: dict[str, Any] = dict(self._detail_cache or {})
-        if isinstance(status_payload, dict):
-            payload.update(status_payload)
+        # 3) Decode once into a snapshot: every reader (entities, scheduler, ETA) shares it.
+        merge_started = time.monotonic() if self.metrics is not None else 0.0
+        snapshot = DeliverySnapshot.from_payloads(self._detail_cache, status_payload, self._include_destination())
+        self._update_eta(snapshot, now, self._record_fix(snapshot, now))
 
         # Track finished time for retention
-        raw_status = (payload.get("status") or "").strip()
+        raw_status = snapshot.status or ""
         status = raw_status.upper() if raw_status else "UNKNOWN"
+        self._fire_transition_events(code, snapshot, status in TERMINAL_STATUSES, now)
         self._last_status = raw_status or None
 
-        finished_iso = payload.get("finished") or payload.get("delivered")  # defensive
-        finished_dt = _parse_iso(finished_iso)
-        if status in FINISHED_STATUSES and finished_dt:
-            self._finished_at = finished_dt
-
-        # Optionally strip destination coords to be privacy-friendly by default
-        if not include_destination and isinstance(payload, dict):
-            if "dropQuestInfo" in payload:
-                # keep object but remove coordinates if present
-                dq = payload.get("dropQuestInfo") or {}
-                if isinstance(dq, dict):
-                    dq = dict(dq)
-                    dq.pop("latitude", None)
-                    dq.pop("longitude", None)
-                    payload["dropQuestInfo"] = dq
+        if status in TERMINAL_STATUSES:
+            newly_finished = self._finished_at is None
+            self._finished_at = snapshot.finished or now
+            # Only delivered orders go to the archive (and so the statistics).
+            if newly_finished and status in FINISHED_STATUSES and self.archive is not None and not self.replaying:
+                self.archive.async_add(archive_record(code, snapshot, self._finished_at))
+            if self._retention_expired(now, retention_hours):
+                self._suspend_polling()
+                return self._inactive_payload("expired_after_finished", code, now)
+            if not self.replaying:
+                # No expiry timer for a replayed delivery: it would fire on the live clock.
+                self._freeze_finished(retention_hours)
+        else:
+            self._set_poll_interval(compute_poll_interval(snapshot, now, self._poll_policy()))
 
+        if self.metrics is not None:
+            self.metrics.observe("merge", time.monotonic() - merge_started)
         return {
             ATTR_ACTIVE: True,
             ATTR_REASON: None,
             ATTR_TRACKING_CODE: code,
             ATTR_LAST_UPDATE: now.isoformat(),
             ATTR_LAST_SEEN_STATUS: raw_status or status,
-            "detail": payload,
+            "snapshot": snapshot,
         }
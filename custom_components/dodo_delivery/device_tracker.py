@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.device_tracker import SourceType, TrackerEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .entity import DodoDeliveryEntity
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities([DodoCourierTracker(coordinator, entry)])
+    async_add_entities([DodoCourierTracker(child, entry) for child in coordinator.children.values()])
+
+    @callback
+    def _add_child(child) -> None:
+        async_add_entities([DodoCourierTracker(child, entry)])
+
+    entry.async_on_unload(coordinator.async_add_child_listener(_add_child))
+
+
+class DodoCourierTracker(DodoDeliveryEntity, TrackerEntity):
+    """Live courier position; the only entity written on a pure GPS change."""
+
+    _attr_name = "Courier"
+    _attr_icon = "mdi:moped"
+
+    def __init__(self, coordinator, entry: ConfigEntry) -> None:
+        super().__init__(coordinator, entry, "courier")
+
+    @property
+    def source_type(self) -> SourceType:
+        return SourceType.GPS
+
+    @property
+    def latitude(self) -> float | None:
+        snapshot = self.snapshot
+        return snapshot.agent_latitude if snapshot else None
+
+    @property
+    def longitude(self) -> float | None:
+        snapshot = self.snapshot
+        return snapshot.agent_longitude if snapshot else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        snapshot = self.snapshot
+        if snapshot is None:
+            return {}
+        attrs = {"agent_name": snapshot.agent_name, "vehicle_name": snapshot.vehicle_name}
+        return {k: v for k, v in attrs.items() if v}
+
+    def _state_key(self) -> Any:
+        return (self.latitude, self.longitude, tuple(self.extra_state_attributes.items()))
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_TRACKING_CODE, CONF_CODE_ENTITY, ATTR_TRACKING_CODE, ATTR_ACTIVE, ATTR_REASON
+
+# Codes identify an order; coordinates, names and addresses identify people and places.
+TO_REDACT = {
+    CONF_TRACKING_CODE,
+    CONF_CODE_ENTITY,
+    ATTR_TRACKING_CODE,
+    "shortCode",
+    "partnerIdentifier",
+    "agentIdentifier",
+    "name",
+    "address",
+    "phone",
+    "latitude",
+    "longitude",
+    "agentLatitude",
+    "agentLongitude",
+}
+
+
+def _data_as_dict(data: dict[str, Any] | None) -> dict[str, Any]:
+    data = dict(data or {})
+    snapshot = data.get("snapshot")
+    if snapshot is not None:
+        data["snapshot"] = snapshot.source
+    return data
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Entry configuration, the current payload and the performance counters."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    eta = coordinator.eta
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "data": async_redact_data(_data_as_dict(coordinator.data), TO_REDACT),
+        "polling": {
+            "poll_interval": coordinator.poll_interval,
+            "last_checked": coordinator.last_checked.isoformat() if coordinator.last_checked else None,
+            "last_update_success": coordinator.last_update_success,
+            "consecutive_failures": coordinator.consecutive_failures,
+            "retry_at": coordinator.retry_at.isoformat() if coordinator.retry_at else None,
+            "replaying": coordinator.replaying,
+        },
+        "stats": dict(coordinator.stats),
+        "detail_cache_hit_ratio": coordinator.detail_cache_hit_ratio,
+        # None unless "Collect performance metrics" is enabled in the options
+        "metrics": coordinator.metrics.as_dict() if coordinator.metrics is not None else None,
+        "circuit_breakers": {host: breaker.as_dict() for host, breaker in coordinator.api.breakers.items()},
+        # Shared by every entry: requests on the wire vs. ones answered by the single-flight layer
+        "api": dict(coordinator.api.stats),
+        "track_points": len(coordinator.track),
+        "archived_deliveries": len(coordinator.archive.records) if coordinator.archive is not None else None,
+        "eta": {
+            "arrival": eta.arrival.isoformat() if eta.arrival else None,
+            "confidence": eta.confidence,
+            "distance_m": eta.distance_m,
+            "speed_mps": eta.speed_mps,
+        }
+        if eta is not None
+        else None,
+        # Coordinators of the additional tracking codes (codes themselves redacted)
+        "additional_codes": [
+            {
+                "active": bool(child.data and child.data.get(ATTR_ACTIVE)),
+                "reason": child.data.get(ATTR_REASON) if child.data else None,
+                "poll_interval": child.poll_interval,
+                "stats": dict(child.stats),
+            }
+            for child in coordinator.children.values()
+        ],
+    }
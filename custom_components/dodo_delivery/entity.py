@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN, ATTR_ACTIVE
+from .coordinator import DodoDeliveryCoordinator
+from .model import DeliverySnapshot
+
+
+def entry_device_info(entry: ConfigEntry) -> DeviceInfo:
+    """One device per config entry groups all of its entities."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, entry.entry_id)},
+        name=entry.title,
+        manufacturer="DODO",
+        model="Gaia order tracking",
+        entry_type=DeviceEntryType.SERVICE,
+    )
+
+
+def coordinator_device_info(coordinator: DodoDeliveryCoordinator) -> DeviceInfo:
+    """Entry device for the first code, a sub-device per additional code."""
+    if coordinator.code is None:
+        return entry_device_info(coordinator.entry)
+    return DeviceInfo(
+        identifiers={coordinator.device_identifier},
+        name=f"{coordinator.entry.title} {coordinator.code}",
+        manufacturer="DODO",
+        model="Gaia order tracking",
+        entry_type=DeviceEntryType.SERVICE,
+        via_device=(DOMAIN, coordinator.entry.entry_id),
+    )
+
+
+class DodoDeliveryEntity(CoordinatorEntity[DodoDeliveryCoordinator]):
+    """Base for entities fed by the entry coordinator or one of its per-code children.
+
+    Every coordinator update reaches every entity; `_state_key` lets an entity
+    skip the state write when the part of the payload it shows didn't change,
+    so e.g. a courier position change only touches the tracker.
+    """
+
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator: DodoDeliveryCoordinator, entry: ConfigEntry, key: str | None = None) -> None:
+        super().__init__(coordinator)
+        self.entry = entry
+        self._attr_unique_id = coordinator.unique_prefix + (f"_{key}" if key else "")
+        self._attr_device_info = coordinator_device_info(coordinator)
+        self._last_state_key: Any = None
+
+    @property
+    def data(self) -> dict[str, Any]:
+        return self.coordinator.data or {}
+
+    @property
+    def snapshot(self) -> DeliverySnapshot | None:
+        """The current delivery; None while there is no active one."""
+        data = self.data
+        if not data.get(ATTR_ACTIVE):
+            return None
+        return data.get("snapshot")
+
+    def _state_key(self) -> Any:
+        """Values this entity renders; None disables write suppression."""
+        return None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        key = self._state_key()
+        if key is not None:
+            key = (self.available, key)
+            if key == self._last_state_key:
+                return
+            self._last_state_key = key
+        super()._handle_coordinator_update()
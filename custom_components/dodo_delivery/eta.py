@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from .helpers import haversine_m
+from .track import Fix
+
+# Fixes used for the speed estimate, and how old they may be.
+SPEED_WINDOW_FIXES = 6
+SPEED_WINDOW_SECONDS = 600
+MIN_SPEED_ELAPSED_SECONDS = 30
+# Below this the courier is treated as standing (traffic light, handover): use the floor speed.
+MIN_SPEED_MPS = 2.0
+# Distance at which the kinematic estimate is trusted half as much as next to the drop point.
+CONFIDENCE_HALF_DISTANCE_M = 5000.0
+
+
+class EtaEstimate(NamedTuple):
+    arrival: datetime | None
+    confidence: float
+    distance_m: float | None
+    speed_mps: float | None
+
+
+def estimate_speed(fixes: list[Fix]) -> float | None:
+    """Average speed (m/s) along the recent fixes, None if there is too little history."""
+    if len(fixes) < 2:
+        return None
+    newest = fixes[-1][0]
+    recent = [fix for fix in fixes if newest - fix[0] <= SPEED_WINDOW_SECONDS]
+    if len(recent) < 2:
+        return None
+    elapsed = recent[-1][0] - recent[0][0]
+    if elapsed < MIN_SPEED_ELAPSED_SECONDS:
+        return None
+    path = sum(haversine_m(a[1], a[2], b[1], b[2]) for a, b in zip(recent, recent[1:]))
+    return path / elapsed
+
+
+def estimate_arrival(
+    now: datetime,
+    fixes: list[Fix],
+    destination: tuple[float, float] | None,
+    expected: datetime | None,
+    window_end: datetime | None,
+) -> EtaEstimate:
+    """Blend a kinematic ETA (courier speed and remaining distance) with the API's time windows.
+
+    The API estimate (`expectedStart`) anchors the result; the kinematic one
+    pulls it in proportion to how much it can be trusted (more fixes, closer
+    to the drop point). `confidence` is 0..1.
+    """
+    distance = speed = kinematic = None
+    kinematic_confidence = 0.0
+    if destination is not None and fixes:
+        last = fixes[-1]
+        distance = haversine_m(last[1], last[2], destination[0], destination[1])
+        speed = estimate_speed(fixes)
+        if speed is not None:
+            kinematic = now + timedelta(seconds=distance / max(speed, MIN_SPEED_MPS))
+            history = min(1.0, len(fixes) / SPEED_WINDOW_FIXES)
+            kinematic_confidence = history / (1.0 + distance / CONFIDENCE_HALF_DISTANCE_M)
+
+    if expected is not None and expected < now:
+        # The API estimate is already in the past: it still tells us "late", but less reliably.
+        expected_confidence = 0.3
+    else:
+        expected_confidence = 0.5
+
+    if kinematic is not None and expected is not None:
+        arrival = expected + (kinematic - expected) * kinematic_confidence
+        confidence = expected_confidence + (1 - expected_confidence) * kinematic_confidence
+    elif kinematic is not None:
+        arrival, confidence = kinematic, kinematic_confidence
+    elif expected is not None:
+        arrival, confidence = expected, expected_confidence
+    elif window_end is not None:
+        arrival, confidence = window_end, 0.2
+    else:
+        return EtaEstimate(None, 0.0, distance, speed)
+
+    return EtaEstimate(max(arrival, now), round(confidence, 2), distance, speed)
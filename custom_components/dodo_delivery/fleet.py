@@ -0,0 +1,150 @@
+"""Summary of every tracked delivery, kept up to date one coordinator at a time."""
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Callable
+from datetime import datetime
+import heapq
+from typing import Any, NamedTuple
+
+from homeassistant.core import HomeAssistant, callback
+
+# Enum states (see model.STATUS_OPTIONS) of deliveries that are over: counted, but not active
+DONE_STATUSES = {"finished", "delivered", "cancelled", "failed"}
+
+
+class FleetItem(NamedTuple):
+    """What the summary needs from one coordinator's current delivery."""
+
+    code: str
+    status: str
+    arrival: datetime | None
+
+
+class FleetIndex:
+    """Counts by status, active codes and the next arrival across all coordinators.
+
+    Every coordinator reports only its own changes; the index adjusts the
+    counters for that one delivery and keeps arrivals in a heap with lazy
+    deletion, so an update never walks the other entries. Listeners are
+    called once per event loop iteration, however many deliveries changed.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        # Entry that carries the summary sensor: the first one set up, handed over on unload.
+        self.owner_entry_id: str | None = None
+        # Per loaded entry: adds the summary sensor through that entry's sensor platform.
+        self._carriers: dict[str, Callable[[], None]] = {}
+        self.counts: Counter[str] = Counter()
+        # Keyed by the coordinator's unique prefix (one entry may track several codes).
+        self._items: dict[str, FleetItem] = {}
+        self._active: dict[str, str] = {}
+        # (arrival, sequence, key); an entry is stale when its sequence is no longer _seq[key].
+        self._arrivals: list[tuple[datetime, int, str]] = []
+        self._seq: dict[str, int] = {}
+        self._next_seq = 0
+        self._listeners: list[Callable[[], None]] = []
+        self._notify_scheduled = False
+
+    @callback
+    def async_update(self, key: str, item: FleetItem | None) -> None:
+        """Replace the delivery of one coordinator (None: nothing tracked)."""
+        old = self._items.get(key)
+        if old == item:
+            return
+        if old is not None:
+            self.counts[old.status] -= 1
+            if not self.counts[old.status]:
+                del self.counts[old.status]
+            self._active.pop(key, None)
+            self._seq.pop(key, None)
+            del self._items[key]
+        if item is not None:
+            self._items[key] = item
+            self.counts[item.status] += 1
+            if item.status not in DONE_STATUSES:
+                self._active[key] = item.code
+                if item.arrival is not None:
+                    self._next_seq += 1
+                    self._seq[key] = self._next_seq
+                    heapq.heappush(self._arrivals, (item.arrival, self._next_seq, key))
+        if len(self._arrivals) > 2 * len(self._seq) + 16:
+            # Mostly stale entries (every ETA change pushes one): rebuild from the live ones.
+            self._arrivals = [entry for entry in self._arrivals if self._seq.get(entry[2]) == entry[1]]
+            heapq.heapify(self._arrivals)
+        self._schedule_notify()
+
+    def next_arrival(self) -> tuple[datetime, str] | None:
+        """Earliest expected arrival among the active deliveries, with its code."""
+        arrivals = self._arrivals
+        while arrivals and self._seq.get(arrivals[0][2]) != arrivals[0][1]:
+            heapq.heappop(arrivals)
+        if not arrivals:
+            return None
+        arrival, _seq, key = arrivals[0]
+        return arrival, self._items[key].code
+
+    @property
+    def active_codes(self) -> list[str]:
+        return list(dict.fromkeys(self._active.values()))
+
+    def as_dict(self) -> dict[str, Any]:
+        nxt = self.next_arrival()
+        return {
+            "by_status": dict(self.counts),
+            "active_codes": self.active_codes,
+            "next_arrival": nxt[0].isoformat() if nxt else None,
+            "next_code": nxt[1] if nxt else None,
+            "tracked": len(self._items),
+        }
+
+    @callback
+    def async_add_carrier(self, entry_id: str, add_sensor: Callable[[], None]) -> Callable[[], None]:
+        """Offer an entry's sensor platform for the summary sensor; the first one carries it.
+
+        When the carrying entry unloads, the sensor is added through the next
+        entry's platform; nothing else of that entry is touched.
+        """
+        self._carriers[entry_id] = add_sensor
+        if self.owner_entry_id is None:
+            self._claim(entry_id)
+
+        @callback
+        def remove_carrier() -> None:
+            del self._carriers[entry_id]
+            if self.owner_entry_id == entry_id:
+                self.owner_entry_id = None
+                successor = next(iter(self._carriers), None)
+                if successor is not None:
+                    self._claim(successor)
+
+        return remove_carrier
+
+    @callback
+    def _claim(self, entry_id: str) -> None:
+        self.owner_entry_id = entry_id
+        self._carriers[entry_id]()
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def _schedule_notify(self) -> None:
+        if self._notify_scheduled or not self._listeners:
+            return
+        self._notify_scheduled = True
+        self.hass.loop.call_soon(self._notify)
+
+    @callback
+    def _notify(self) -> None:
+        self._notify_scheduled = False
+        for update_callback in list(self._listeners):
+            update_callback()
@@ -0,0 +1,95 @@
+"""Serving the bundled Lovelace card: one static path, precompressed, versioned URL."""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import CARD_FILE, CARD_URL_PATH
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    # Home Assistant 2024.7+
+    from homeassistant.components.http import StaticPathConfig
+except ImportError:
+    StaticPathConfig = None
+
+_LOGGER = logging.getLogger(__name__)
+
+WWW_DIR = Path(__file__).parent / "www"
+
+
+def _prepare_card(source: Path) -> str:
+    """Write the .gz/.br siblings next to the card if stale; returns the content hash.
+
+    aiohttp serves such a sibling instead of the file when the browser accepts
+    that encoding, so the card is compressed once, not on every request.
+    """
+    body = source.read_bytes()
+    mtime = source.stat().st_mtime
+    variants = [(".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append((".br", brotli.compress))
+    for suffix, compress in variants:
+        target = source.with_name(source.name + suffix)
+        if target.is_file() and target.stat().st_mtime >= mtime:
+            continue
+        try:
+            target.write_bytes(compress(body))
+        except OSError as err:
+            # Read-only install: the card is still served, just uncompressed.
+            _LOGGER.debug("Cannot write %s: %s", target, err)
+    return hashlib.sha256(body).hexdigest()[:12]
+
+
+async def async_register_card(hass: HomeAssistant) -> str:
+    """Serve www/ under /dodo_delivery (once per HA instance); returns the card's versioned URL.
+
+    The URL carries a content hash, so the long-lived cache headers are safe:
+    a new card version gets a new URL.
+    """
+    version = await hass.async_add_executor_job(_prepare_card, WWW_DIR / CARD_FILE)
+    if StaticPathConfig is not None:
+        await hass.http.async_register_static_paths([StaticPathConfig(CARD_URL_PATH, str(WWW_DIR), True)])
+    else:
+        hass.http.register_static_path(CARD_URL_PATH, str(WWW_DIR), cache_headers=True)
+    return f"{CARD_URL_PATH}/{CARD_FILE}?v={version}"
+
+
+def _lovelace_resources(hass: HomeAssistant) -> Any:
+    lovelace = hass.data.get("lovelace")
+    if isinstance(lovelace, dict):
+        return lovelace.get("resources")
+    return getattr(lovelace, "resources", None)
+
+
+async def async_register_card_resource(hass: HomeAssistant, url: str) -> None:
+    """Add the card to the dashboard resources, or move an existing entry to `url`.
+
+    Only storage-mode dashboards can be changed; YAML resources stay as they are.
+    """
+    resources = _lovelace_resources(hass)
+    if resources is None or not hasattr(resources, "async_create_item"):
+        _LOGGER.debug("Lovelace resources are not editable; add %s manually", url)
+        return
+    if not resources.loaded:
+        await resources.async_load()
+        resources.loaded = True
+
+    base = url.split("?", 1)[0]
+    for item in resources.async_items():
+        if item["url"].split("?", 1)[0] != base:
+            continue
+        if item["url"] != url:
+            await resources.async_update_item(item["id"], {"res_type": "module", "url": url})
+        return
+    await resources.async_create_item({"res_type": "module", "url": url})
+    _LOGGER.info("Added %s to the dashboard resources", url)
@@ -1,6 +1,7 @@
 \
 from __future__ import annotations
 
+import math
 import re
 from typing import Optional
 
@@ -17,3 +18,39 @@ def extract_code(text: str | None) -> Optional[str]:
     if m2:
         return m2.group(1).upper()
     return None
+
+# One pass over long texts (e.g. email bodies): group 1 is a link code, group 2 a bare code.
+CODE_SCAN_RE = re.compile(f"{URL_RE.pattern}|{CODE_RE.pattern}", re.IGNORECASE)
+
+def scan_codes(text: str) -> tuple[list[str], list[str]]:
+    """Distinct codes from t.idodo.group links and bare 8-char words, in order of appearance."""
+    links: dict[str, None] = {}
+    bare: dict[str, None] = {}
+    for m in CODE_SCAN_RE.finditer(text):
+        if m.group(1):
+            links[m.group(1).upper()] = None
+        else:
+            bare[m.group(2).upper()] = None
+    return list(links), [code for code in bare if code not in links]
+
+def extract_codes(text: str | None) -> list[str]:
+    """Distinct tracking codes in `text`, in order of appearance.
+
+    Same rule as for emails: once the text has a t.idodo.group link, other
+    8-character words ("Tracking", "Delivery") aren't codes; bare codes only
+    count in texts without links.
+    """
+    if not text:
+        return []
+    links, bare = scan_codes(text)
+    return links or bare
+
+EARTH_RADIUS_M = 6_371_000.0
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two WGS84 points in meters."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+
+from .const import (
+    IMAP_EVENT,
+    CONF_IMAP_ENTRY_ID,
+    CONF_IMAP_SUBJECT,
+    DEFAULT_IMAP_SUBJECT,
+    CONF_IMAP_REQUIRE_LINK,
+    DEFAULT_IMAP_REQUIRE_LINK,
+)
+from .coordinator import DodoDeliveryCoordinator
+from .helpers import scan_codes
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_listen_imap(hass: HomeAssistant, entry: ConfigEntry, coordinator: DodoDeliveryCoordinator) -> CALLBACK_TYPE:
+    """Feed tracking codes from the IMAP integration's emails into the coordinator.
+
+    Replaces the IMAP -> input_text blueprint: events of other IMAP entries or
+    with another subject are dropped by the bus filter before the handler is
+    scheduled; matching bodies are scanned once with a precompiled pattern.
+    """
+    opts = {**entry.data, **entry.options}
+    imap_entry_id = opts.get(CONF_IMAP_ENTRY_ID)
+    subject_filter = str(opts.get(CONF_IMAP_SUBJECT, DEFAULT_IMAP_SUBJECT) or "").lower()
+    require_link = bool(opts.get(CONF_IMAP_REQUIRE_LINK, DEFAULT_IMAP_REQUIRE_LINK))
+
+    @callback
+    def _event_filter(event_data: dict[str, Any]) -> bool:
+        if event_data.get("entry_id") != imap_entry_id:
+            return False
+        return not subject_filter or subject_filter in str(event_data.get("subject") or "").lower()
+
+    @callback
+    def _on_imap_content(event: Event) -> None:
+        text = event.data.get("text")
+        if not text:
+            return
+        links, bare = scan_codes(str(text))
+        # Email bodies are full of 8-letter words; bare codes only count without the link requirement.
+        codes = links if links or require_link else bare
+        if not codes:
+            return
+        _LOGGER.debug("Tracking codes from email %s: %s", event.data.get("uid"), codes)
+        coordinator.async_add_codes(codes)
+
+    return hass.bus.async_listen(IMAP_EVENT, _on_imap_content, event_filter=_event_filter)
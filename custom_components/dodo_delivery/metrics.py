@@ -0,0 +1,72 @@
+"""Opt-in timing histograms for one config entry (request, decode, merge, attributes)."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any
+
+# Upper bucket bounds in milliseconds; one extra overflow bucket follows.
+BUCKETS_MS = (1, 5, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+METRIC_NAMES = ("request", "decode", "merge", "attributes")
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; observe() is a bisect and a few additions."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect_left(BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    @property
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-quantile (None past the last bound)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS_MS, self.counts):
+            seen += n
+            if seen >= rank:
+                return float(bound)
+        return None
+
+    def as_dict(self) -> dict[str, Any]:
+        mean = self.mean
+        buckets = {f"le_{bound}": n for bound, n in zip(BUCKETS_MS, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": round(mean, 2) if mean is not None else None,
+            "p95_ms": self.quantile(0.95),
+            "max_ms": round(self.max, 2),
+            "buckets": buckets,
+        }
+
+
+class EntryMetrics:
+    """Histograms of one entry, keyed by METRIC_NAMES; values are given in seconds."""
+
+    __slots__ = ("histograms",)
+
+    def __init__(self) -> None:
+        self.histograms = {name: Histogram() for name in METRIC_NAMES}
+
+    def observe(self, name: str, seconds: float) -> None:
+        self.histograms[name].observe(seconds * 1000.0)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {name: hist.as_dict() for name, hist in self.histograms.items()}
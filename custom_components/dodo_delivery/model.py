@@ -0,0 +1,200 @@
+"""Normalized, immutable view of one delivery, decoded once per changed payload."""
+from __future__ import annotations
+
+from datetime import datetime
+import re
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+# Enum sensor states (snake_case of the API status codes)
+STATUS_OPTIONS = [
+    "pickup_started",
+    "pickup_completed",
+    "on_way",
+    "arrived",
+    "near_destination",
+    "finished",
+    "delivered",
+    "cancelled",
+    "failed",
+    "unknown",
+]
+
+# Main sensor state (short) and the longer Hungarian description attribute
+STATUS_SHORT_HU = {
+    "PickupStarted": "Feldolgozás",
+    "PickupCompleted": "Átvéve",
+    "OnWay": "Úton",
+    "Arrived": "Megérkezett",
+    "NearDestination": "Hamarosan",
+    "Finished": "Kézbesítve",
+    "Delivered": "Kézbesítve",
+    "Cancelled": "Törölve",
+    "Failed": "Sikertelen",
+}
+STATUS_HU = {
+    "PickupStarted": "A megrendelés feldolgozása folyamatban van.",
+    "PickupCompleted": "A futár átvette a megrendelését.",
+    "OnWay": "A futár úton van Önhöz.",
+    "Arrived": "A futár megérkezett.",
+    "NearDestination": "A futár hamarosan érkezik.",
+    "Finished": "A megrendelését sikeresen kézbesítettük.",
+    "Delivered": "A megrendelését sikeresen kézbesítettük.",
+    "Cancelled": "A rendelést törölték.",
+    "Failed": "A kézbesítés sikertelen.",
+}
+
+# Top-level time fields kept as ISO strings (attributes) and parsed datetimes
+TIME_KEYS = ("requiredStart", "requiredEnd", "expectedStart", "started", "finished")
+
+# Nested objects and the keys read from them
+_NESTED_KEYS = {
+    "agent": ("agentIdentifier", "name"),
+    "pickupQuestInfo": ("name", "latitude", "longitude"),
+    "dropQuestInfo": ("latitude", "longitude"),
+    "vehicle": ("name",),
+}
+_FLAT_KEYS = ("status", "shortCode", "partnerIdentifier", *TIME_KEYS, "delivered", "agentLatitude", "agentLongitude")
+
+_CAMEL_RE = re.compile(r"(?<!^)(?=[A-Z])")
+
+
+def compact_payload(detail: dict[str, Any] | None, status: dict[str, Any] | None) -> dict[str, Any]:
+    """The fields the integration uses, status values taking precedence over detail ones.
+
+    Same result as merging the two documents and dropping everything else,
+    without copying either of them.
+    """
+    detail = detail if isinstance(detail, dict) else {}
+    status = status if isinstance(status, dict) else {}
+    source: dict[str, Any] = {}
+    for key in _FLAT_KEYS:
+        value = status[key] if key in status else detail.get(key)
+        if value is not None:
+            source[key] = value
+    for key, fields in _NESTED_KEYS.items():
+        obj = status[key] if key in status else detail.get(key)
+        if isinstance(obj, dict):
+            nested = {field: obj[field] for field in fields if obj.get(field) is not None}
+            if nested:
+                source[key] = nested
+    return source
+
+
+def _float(value: Any) -> float | None:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _time(value: Any) -> datetime | None:
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return dt_util.parse_datetime(value)
+    except ValueError:
+        return None
+
+
+class DeliverySnapshot:
+    """One delivery as the entities, scheduler and ETA engine see it.
+
+    Built from a compact payload (see `compact_payload`); every derived value,
+    including the main sensor's state and attributes, is computed here once and
+    shared by all readers until the next change. Instances are immutable and
+    compare equal when their source fields are equal.
+    """
+
+    __slots__ = (
+        "source",
+        "status",
+        "status_key",
+        "state_hu",
+        "required_start",
+        "required_end",
+        "expected_start",
+        "started",
+        "finished",
+        "agent_latitude",
+        "agent_longitude",
+        "drop_latitude",
+        "drop_longitude",
+        "agent_name",
+        "vehicle_name",
+        "attributes",
+    )
+
+    def __init__(self, source: dict[str, Any], include_destination: bool = False) -> None:
+        _set = object.__setattr__
+        _set(self, "source", source)
+        agent = source.get("agent") or {}
+        pickup = source.get("pickupQuestInfo") or {}
+        drop = source.get("dropQuestInfo") or {}
+        vehicle = source.get("vehicle") or {}
+
+        raw_status = str(source.get("status") or "").strip()
+        status_code = raw_status or "UNKNOWN"
+        _set(self, "status", raw_status or None)
+        status_key = _CAMEL_RE.sub("_", raw_status).lower() if raw_status else None
+        _set(self, "status_key", (status_key if status_key in STATUS_OPTIONS else "unknown") if status_key else None)
+        _set(self, "state_hu", STATUS_SHORT_HU.get(status_code, status_code))
+
+        _set(self, "required_start", _time(source.get("requiredStart")))
+        _set(self, "required_end", _time(source.get("requiredEnd")))
+        _set(self, "expected_start", _time(source.get("expectedStart")))
+        _set(self, "started", _time(source.get("started")))
+        _set(self, "finished", _time(source.get("finished") or source.get("delivered")))
+        _set(self, "agent_latitude", _float(source.get("agentLatitude")))
+        _set(self, "agent_longitude", _float(source.get("agentLongitude")))
+        _set(self, "drop_latitude", _float(drop.get("latitude")))
+        _set(self, "drop_longitude", _float(drop.get("longitude")))
+        _set(self, "agent_name", agent.get("name") or None)
+        _set(self, "vehicle_name", vehicle.get("name") or None)
+
+        attrs: dict[str, Any] = {
+            "status_hu": STATUS_HU.get(status_code, status_code),
+            "status_code": status_code,
+            "short_code": source.get("shortCode"),
+            "partner_identifier": source.get("partnerIdentifier"),
+        }
+        for key in TIME_KEYS:
+            attrs[key] = source.get(key)
+        attrs["agent_id"] = agent.get("agentIdentifier")
+        attrs["agent_name"] = self.agent_name
+        attrs["pickup_name"] = pickup.get("name")
+        if pickup.get("latitude") is not None and pickup.get("longitude") is not None:
+            attrs["pickup_latitude"] = pickup["latitude"]
+            attrs["pickup_longitude"] = pickup["longitude"]
+        # The drop point is always kept for the scheduler/ETA, but only published on request.
+        if include_destination and drop.get("latitude") is not None and drop.get("longitude") is not None:
+            attrs["drop_latitude"] = drop["latitude"]
+            attrs["drop_longitude"] = drop["longitude"]
+        attrs["vehicle_name"] = self.vehicle_name
+        _set(self, "attributes", {k: v for k, v in attrs.items() if v not in ("", None, {}, [])})
+
+    @classmethod
+    def from_payloads(
+        cls, detail: dict[str, Any] | None, status: dict[str, Any] | None, include_destination: bool = False
+    ) -> DeliverySnapshot:
+        return cls(compact_payload(detail, status), include_destination)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DeliverySnapshot):
+            return NotImplemented
+        return self.source == other.source and self.attributes == other.attributes
+
+    def __repr__(self) -> str:
+        return f"DeliverySnapshot(status={self.status!r})"
+
+    @property
+    def has_destination(self) -> bool:
+        return self.drop_latitude is not None and self.drop_longitude is not None
+
+    @property
+    def has_agent_position(self) -> bool:
+        return self.agent_latitude is not None and self.agent_longitude is not None
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+import logging
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .const import MAX_CONCURRENT_POLLS, MAX_POLLS_PER_SECOND
+
+if TYPE_CHECKING:
+    from .coordinator import DodoDeliveryCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DodoDeliveryPoller:
+    """Single polling engine for every tracked entry of the domain.
+
+    Coordinators don't own a timer; they tell the poller when they want to be
+    refreshed next. The poller keeps one timer armed for the earliest due entry,
+    launches at most `max_per_second` polls per second (most urgent first, i.e.
+    the shortest poll interval such as a courier near the destination), spreads
+    the launches evenly over that second and runs at most `max_concurrent`
+    fetches at the same time.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_concurrent: int = MAX_CONCURRENT_POLLS,
+        max_per_second: int = MAX_POLLS_PER_SECOND,
+    ) -> None:
+        self.hass = hass
+        self._max_per_second = max_per_second
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._due: dict[DodoDeliveryCoordinator, datetime] = {}
+        self._running: set[DodoDeliveryCoordinator] = set()
+        self._timer_unsub: CALLBACK_TYPE | None = None
+        self._timer_at: datetime | None = None
+
+    @callback
+    def async_schedule(self, coordinator: DodoDeliveryCoordinator, interval: int | None) -> None:
+        """(Re)schedule a coordinator `interval` seconds from now; None stops polling it."""
+        if interval is None:
+            self._due.pop(coordinator, None)
+        else:
+            self._due[coordinator] = dt_util.utcnow() + timedelta(seconds=interval)
+        self._arm()
+
+    @callback
+    def async_remove(self, coordinator: DodoDeliveryCoordinator) -> None:
+        self._due.pop(coordinator, None)
+        self._arm()
+
+    @callback
+    def async_shutdown(self) -> None:
+        self._due.clear()
+        self._cancel_timer()
+
+    def _cancel_timer(self) -> None:
+        if self._timer_unsub is not None:
+            self._timer_unsub()
+        self._timer_unsub = None
+        self._timer_at = None
+
+    @callback
+    def _arm(self, not_before: datetime | None = None) -> None:
+        """Keep exactly one timer armed for the earliest due coordinator."""
+        pending = [due for coord, due in self._due.items() if coord not in self._running]
+        if not pending:
+            self._cancel_timer()
+            return
+        when = min(pending)
+        if not_before is not None and when < not_before:
+            when = not_before
+        if self._timer_at is not None and self._timer_at <= when:
+            return
+        self._cancel_timer()
+        self._timer_at = when
+        self._timer_unsub = async_track_point_in_utc_time(self.hass, self._handle_timer, when)
+
+    @callback
+    def _handle_timer(self, now: datetime) -> None:
+        self._timer_unsub = None
+        self._timer_at = None
+
+        due = [coord for coord, at in self._due.items() if at <= now and coord not in self._running]
+        # Most urgent first: shortest requested interval, then the longest overdue.
+        due.sort(key=lambda coord: (coord.poll_interval or 0, self._due[coord]))
+        batch = due[: self._max_per_second]
+        spacing = 1.0 / self._max_per_second
+
+        for index, coordinator in enumerate(batch):
+            self._running.add(coordinator)
+            self.hass.async_create_background_task(
+                self._async_poll(coordinator, index * spacing),
+                name=f"{coordinator.name} poll",
+            )
+
+        # Over budget: the rest waits for the next one-second slot.
+        self._arm(not_before=now + timedelta(seconds=1) if len(due) > len(batch) else None)
+
+    async def _async_poll(self, coordinator: DodoDeliveryCoordinator, delay: float) -> None:
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+            async with self._semaphore:
+                # The coordinator reschedules itself when the refresh finishes.
+                await coordinator.async_refresh()
+        except Exception:  # noqa: BLE001 - never let one entry kill the shared loop
+            _LOGGER.exception("Unexpected error polling %s", coordinator.name)
+        finally:
+            self._running.discard(coordinator)
+            self._arm()
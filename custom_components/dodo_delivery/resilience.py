@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from email.utils import parsedate_to_datetime
+import random
+import time
+from typing import Any
+
+from .const import BACKOFF_MAX, BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def backoff_delay(failures: int, base: float, cap: float = BACKOFF_MAX, retry_after: float | None = None) -> float:
+    """Exponential backoff with equal jitter; never shorter than Retry-After."""
+    ceiling = min(cap, base * (2 ** max(0, failures - 1)))
+    delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return max(base, delay)
+
+
+class CircuitBreaker:
+    """Stops all entries from hammering a failing host.
+
+    Opens after `failure_threshold` consecutive failures; after `reset_timeout`
+    a single probe request is allowed (half-open). Its success closes the
+    breaker again, its failure re-opens it for another `reset_timeout`.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_count = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def retry_in(self) -> float:
+        """Seconds until the breaker lets a probe through (0 when closed)."""
+        if self.state != STATE_OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def allow_request(self) -> bool:
+        if self.state == STATE_CLOSED:
+            return True
+        if self.state == STATE_OPEN and self.retry_in() <= 0:
+            self.state = STATE_HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == STATE_HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def cancel_probe(self) -> None:
+        """The probe was cancelled before an outcome; let another one through."""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == STATE_HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != STATE_OPEN:
+                self.opened_count += 1
+            self.state = STATE_OPEN
+            self._opened_at = time.monotonic()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opened_count": self.opened_count,
+            "retry_in": round(self.retry_in(), 1),
+        }
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from .helpers import haversine_m
+from .model import DeliverySnapshot
+
+# Statuses where the courier is at (or right next to) the drop point.
+NEAR_STATUSES = {"NEARDESTINATION", "ARRIVED"}
+# The order is still being picked/packed in the store.
+WAITING_STATUSES = {"PICKUPSTARTED"}
+
+# Below this distance to the drop point the courier counts as "near".
+NEAR_DISTANCE_M = 1500.0
+# Rough city driving speed used to turn a distance into a time-to-arrival.
+ASSUMED_SPEED_MPS = 8.0
+# Arrival closer than this switches to the near interval.
+NEAR_WINDOW = timedelta(minutes=5)
+# Poll roughly this many times over the remaining time-to-arrival.
+POLLS_PER_REMAINING = 6
+
+
+@dataclass(frozen=True)
+class PollPolicy:
+    """Per-phase polling intervals (seconds)."""
+
+    base: int
+    near: int
+    idle: int
+    adaptive: bool = True
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return max(low, min(high, value))
+
+
+def courier_distance_m(snapshot: DeliverySnapshot) -> float | None:
+    """Distance from the courier's live position to the drop point, if both are known."""
+    if not snapshot.has_agent_position or not snapshot.has_destination:
+        return None
+    return haversine_m(snapshot.agent_latitude, snapshot.agent_longitude, snapshot.drop_latitude, snapshot.drop_longitude)
+
+
+def compute_poll_interval(snapshot: DeliverySnapshot, now: datetime, policy: PollPolicy) -> int:
+    """Pick the next poll interval (seconds) from the delivery phase.
+
+    The snapshot keeps the drop point even when it is not published, so the
+    distance can still be used.
+    """
+    if not policy.adaptive:
+        return policy.base
+
+    status = (snapshot.status or "").upper()
+    if status in NEAR_STATUSES:
+        return policy.near
+
+    arrival = snapshot.expected_start or snapshot.required_start
+    required_end = snapshot.required_end
+    remaining = (arrival - now) if arrival else None
+
+    if status in WAITING_STATUSES:
+        # Late or no estimate: keep the normal cadence, the courier may leave any time.
+        if remaining is None or remaining <= NEAR_WINDOW:
+            return policy.base
+        if required_end is not None and now >= required_end:
+            return policy.base
+        return int(_clamp(remaining.total_seconds() / POLLS_PER_REMAINING, policy.base, policy.idle))
+
+    distance = courier_distance_m(snapshot)
+    if distance is not None:
+        if distance <= NEAR_DISTANCE_M:
+            return policy.near
+        by_distance = timedelta(seconds=distance / ASSUMED_SPEED_MPS)
+        remaining = by_distance if remaining is None else min(remaining, by_distance)
+
+    if remaining is None:
+        return policy.base
+    if remaining <= NEAR_WINDOW:
+        return policy.near
+    return int(_clamp(remaining.total_seconds() / POLLS_PER_REMAINING, policy.near, policy.base))
@@ -1,77 +1,144 @@
 from __future__ import annotations
 
+from datetime import datetime
+import time
 from typing import Any
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, MATCH_ALL, PERCENTAGE, UnitOfInformation, UnitOfTime
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, ATTR_ACTIVE, ATTR_REASON, ATTR_TRACKING_CODE, ATTR_LAST_UPDATE, ATTR_LAST_SEEN_STATUS
+from .const import DOMAIN, ATTR_ACTIVE, ATTR_REASON, ATTR_TRACKING_CODE, ATTR_LAST_UPDATE, ATTR_LAST_SEEN_STATUS, ATTR_POLL_INTERVAL
+from .entity import DodoDeliveryEntity, entry_device_info
+from .fleet import FleetIndex
+from .model import STATUS_HU, STATUS_OPTIONS
+
+# Diagnostic metric sensors: key, name, unit, device class, state class, icon
+METRIC_SENSORS = (
+    ("request_latency", "Request latency", UnitOfTime.MILLISECONDS, SensorDeviceClass.DURATION, SensorStateClass.MEASUREMENT, "mdi:timer-outline"),
+    ("poll_interval", "Poll interval", UnitOfTime.SECONDS, SensorDeviceClass.DURATION, SensorStateClass.MEASUREMENT, "mdi:timer-sync-outline"),
+    ("detail_cache_hit_ratio", "Detail cache hit ratio", PERCENTAGE, None, SensorStateClass.MEASUREMENT, "mdi:cached"),
+    ("failures", "Failed polls", None, None, SensorStateClass.TOTAL_INCREASING, "mdi:alert-circle-outline"),
+    ("bytes_received", "Bytes received", UnitOfInformation.BYTES, SensorDeviceClass.DATA_SIZE, SensorStateClass.TOTAL_INCREASING, "mdi:download-network-outline"),
+)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([DodoDeliverySensor(coordinator, entry)])
+    async_add_entities(
+        [
+            *_delivery_sensors(coordinator, entry),
+            DodoDeliveryLastCheckedSensor(coordinator, entry),
+            *(DodoDeliveryMetricSensor(coordinator, entry, *spec) for spec in METRIC_SENSORS),
+        ]
+    )
+    fleet = coordinator.fleet
+    if fleet is not None:
+        # One summary for all entries, carried by one of them and handed over when it unloads.
+        entry.async_on_unload(
+            fleet.async_add_carrier(entry.entry_id, lambda: async_add_entities([DodoDeliveryFleetSensor(fleet)]))
+        )
+    for child in coordinator.children.values():
+        async_add_entities(_delivery_sensors(child, entry))
 
+    @callback
+    def _add_child(child) -> None:
+        async_add_entities(_delivery_sensors(child, entry))
+
+    entry.async_on_unload(coordinator.async_add_child_listener(_add_child))
+
+
+@callback
+def _is_tracker_change(event_data: er.EventEntityRegistryUpdatedData) -> bool:
+    return event_data["entity_id"].startswith("device_tracker.")
 
-class DodoDeliverySensor(CoordinatorEntity, SensorEntity):
-    _attr_has_entity_name = True
-    _attr_name = "DODO delivery"
+
+def _delivery_sensors(coordinator, entry: ConfigEntry) -> list[SensorEntity]:
+    """Sensors of one tracking code (the entry's first code or a child's)."""
+    return [
+        DodoDeliverySensor(coordinator, entry),
+        DodoDeliveryStatusSensor(coordinator, entry),
+        DodoDeliveryTimestampSensor(coordinator, entry, "expected_arrival", "Expected arrival", "expected_start", "mdi:clock-outline"),
+        DodoDeliveryTimestampSensor(coordinator, entry, "window_end", "Delivery window end", "required_end", "mdi:clock-end"),
+        DodoDeliveryTimestampSensor(coordinator, entry, "delivered_at", "Delivered at", "finished", "mdi:check-circle-outline"),
+        DodoDeliveryEtaSensor(coordinator, entry),
+    ]
+
+
+class DodoDeliverySensor(DodoDeliveryEntity, SensorEntity):
+    # Device name ("DODO delivery"), keeps sensor.dodo_delivery for the card
+    _attr_name = None
+    # Rewritten on every change; not worth a new attributes row in the recorder
+    _unrecorded_attributes = frozenset({ATTR_LAST_UPDATE})
 
     def __init__(self, coordinator, entry: ConfigEntry) -> None:
-        super().__init__(coordinator)
-        self.entry = entry
-        self._attr_unique_id = f"{DOMAIN}_{entry.entry_id}"
+        super().__init__(coordinator, entry)
         self._attr_icon = "mdi:truck-fast"
+        # Attributes are built once per coordinator payload and reused by every read.
+        self._attrs: dict[str, Any] | None = None
+        self._attrs_data: dict[str, Any] | None = None
+        self._courier_entity_id: str | None = None
+
+    def _state_key(self) -> Any:
+        attrs = self.extra_state_attributes
+        return (self.native_value, {k: v for k, v in attrs.items() if k != ATTR_LAST_UPDATE})
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._resolve_courier_entity()
+        # The tracker may be registered after this sensor (or renamed later): follow the registry.
+        self.async_on_remove(
+            self.hass.bus.async_listen(
+                er.EVENT_ENTITY_REGISTRY_UPDATED, self._handle_registry_update, event_filter=_is_tracker_change
+            )
+        )
+
+    @callback
+    def _resolve_courier_entity(self) -> bool:
+        """Look up the courier tracker's entity id; True if it changed."""
+        entity_id = er.async_get(self.hass).async_get_entity_id(
+            "device_tracker", DOMAIN, f"{self.coordinator.unique_prefix}_courier"
+        )
+        if entity_id == self._courier_entity_id:
+            return False
+        self._courier_entity_id = entity_id
+        return True
+
+    @callback
+    def _handle_registry_update(self, _event: Event[er.EventEntityRegistryUpdatedData]) -> None:
+        if self._resolve_courier_entity():
+            self._attrs = None
+            self.async_write_ha_state()
 
     @property
     def native_value(self) -> str:
-        data = self.coordinator.data or {}
+        data = self.data
         if not data.get(ATTR_ACTIVE):
             return "Nincs aktív rendelés"
-        detail = data.get("detail") or {}
-        status_code = (detail.get("status") or data.get(ATTR_LAST_SEEN_STATUS) or "unknown") or "unknown"
-        short_map = {
-            "PickupStarted": "Feldolgozás",
-            "PickupCompleted": "Átvéve",
-            "OnWay": "Úton",
-            "Arrived": "Megérkezett",
-            "NearDestination": "Hamarosan",
-            "Finished": "Kézbesítve",
-            "Delivered": "Kézbesítve",
-            "Cancelled": "Törölve",
-            "Failed": "Sikertelen",
-        }
-        return short_map.get(str(status_code), str(status_code))
+        snapshot = data.get("snapshot")
+        if snapshot is None:
+            return str(data.get(ATTR_LAST_SEEN_STATUS) or "unknown")
+        return snapshot.state_hu
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return extra attributes for the sensor (compact, card-oriented)."""
-        data: dict[str, Any] = self.coordinator.data or {}
-        detail: dict[str, Any] = data.get("detail") or {}
-
-        # Raw status code (for automations / debugging)
-        status_code = (
-            detail.get("status")
-            or data.get(ATTR_LAST_SEEN_STATUS)
-            or self._attr_native_value
-            or "unknown"
-        )
+        data = self.coordinator.data
+        if self._attrs is None or data is not self._attrs_data:
+            metrics = self.coordinator.metrics
+            started = time.monotonic() if metrics is not None else 0.0
+            self._attrs = self._build_attributes()
+            self._attrs_data = data
+            if metrics is not None:
+                metrics.observe("attributes", time.monotonic() - started)
+        return self._attrs
 
-        status_map = {
-            "PickupStarted": "A megrendelés feldolgozása folyamatban van.",
-            "PickupCompleted": "A futár átvette a megrendelését.",
-            "OnWay": "A futár úton van Önhöz.",
-            "Arrived": "A futár megérkezett.",
-            "NearDestination": "A futár hamarosan érkezik.",
-            "Finished": "A megrendelését sikeresen kézbesítettük.",
-            "Delivered": "A megrendelését sikeresen kézbesítettük.",
-            "Cancelled": "A rendelést törölték.",
-            "Failed": "A kézbesítés sikertelen.",
-        }
-        status_hu = status_map.get(str(status_code), str(status_code))
+    def _build_attributes(self) -> dict[str, Any]:
+        data: dict[str, Any] = self.coordinator.data or {}
+        snapshot = self.snapshot
 
         attrs: dict[str, Any] = {
             # Existing (requested to keep)
@@ -82,57 +149,226 @@ class DodoDeliverySensor(CoordinatorEntity, SensorEntity):
             # Useful flags
             ATTR_ACTIVE: data.get(ATTR_ACTIVE),
             ATTR_REASON: data.get(ATTR_REASON),
-
-            # Hungarian status + raw code
-            "status_hu": status_hu,
-            "status_code": status_code,
         }
+        if snapshot is not None:
+            # Hungarian status + raw code, order identifiers, times, courier, pickup/drop points
+            attrs.update(snapshot.attributes)
+        else:
+            status_code = data.get(ATTR_LAST_SEEN_STATUS) or self.native_value
+            attrs["status_hu"] = STATUS_HU.get(str(status_code), str(status_code))
+            attrs["status_code"] = status_code
 
-        # Order identifiers
-        if detail.get("shortCode"):
-            attrs["short_code"] = detail.get("shortCode")
-        if detail.get("partnerIdentifier"):
-            attrs["partner_identifier"] = detail.get("partnerIdentifier")
-
-        # Time fields (ISO strings as provided by the API)
-        for key in ["requiredStart", "requiredEnd", "expectedStart", "started", "finished"]:
-            val = detail.get(key)
-            if val:
-                attrs[key] = val
-
-        # Courier (agent)
-        agent = detail.get("agent") or {}
-        if isinstance(agent, dict):
-            if agent.get("agentIdentifier"):
-                attrs["agent_id"] = agent.get("agentIdentifier")
-            if agent.get("name"):
-                attrs["agent_name"] = agent.get("name")
-
-        # Coordinates (flat, only when present)
-        pickup = detail.get("pickupQuestInfo") or {}
-        if isinstance(pickup, dict):
-            if pickup.get("name"):
-                attrs["pickup_name"] = pickup.get("name")
-            if pickup.get("latitude") is not None and pickup.get("longitude") is not None:
-                attrs["pickup_latitude"] = pickup.get("latitude")
-                attrs["pickup_longitude"] = pickup.get("longitude")
-
-        drop = detail.get("dropQuestInfo") or {}
-        if isinstance(drop, dict):
-            # Some phases may not include it; only store when coordinates exist
-            if drop.get("latitude") is not None and drop.get("longitude") is not None:
-                attrs["drop_latitude"] = drop.get("latitude")
-                attrs["drop_longitude"] = drop.get("longitude")
-
-        # Agent live coordinates may appear at later stages
-        if detail.get("agentLatitude") is not None and detail.get("agentLongitude") is not None:
-            attrs["agent_latitude"] = detail.get("agentLatitude")
-            attrs["agent_longitude"] = detail.get("agentLongitude")
-
-        # Vehicle name, if present
-        veh = detail.get("vehicle") or {}
-        if isinstance(veh, dict) and veh.get("name"):
-            attrs["vehicle_name"] = veh.get("name")
+        # Agent live coordinates live on the courier device_tracker (high churn)
+        attrs["courier_entity_id"] = self._courier_entity_id
 
         # Remove empty / None values to keep attributes clean
         return {k: v for k, v in attrs.items() if v not in ("", None, {}, [])}
+
+
+class DodoDeliveryStatusSensor(DodoDeliveryEntity, SensorEntity):
+    """Raw delivery status as an enum (translated states, cheap to automate on)."""
+
+    _attr_name = "Status"
+    _attr_translation_key = "status"
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = STATUS_OPTIONS
+    _attr_icon = "mdi:list-status"
+
+    def __init__(self, coordinator, entry: ConfigEntry) -> None:
+        super().__init__(coordinator, entry, "status")
+
+    @property
+    def native_value(self) -> str | None:
+        snapshot = self.snapshot
+        return snapshot.status_key if snapshot else None
+
+    def _state_key(self) -> Any:
+        return self.native_value
+
+
+class DodoDeliveryTimestampSensor(DodoDeliveryEntity, SensorEntity):
+    """One of the parsed API time fields of the snapshot as a timestamp sensor."""
+
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+
+    def __init__(self, coordinator, entry: ConfigEntry, key: str, name: str, field: str, icon: str) -> None:
+        super().__init__(coordinator, entry, key)
+        self._attr_name = name
+        self._attr_icon = icon
+        self._field = field
+
+    @property
+    def native_value(self) -> datetime | None:
+        snapshot = self.snapshot
+        return getattr(snapshot, self._field) if snapshot else None
+
+    def _state_key(self) -> Any:
+        return self.native_value
+
+
+class DodoDeliveryEtaSensor(DodoDeliveryEntity, SensorEntity):
+    """Local arrival estimate: courier speed and distance blended with the API window."""
+
+    _attr_name = "Estimated arrival"
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_icon = "mdi:map-clock"
+
+    def __init__(self, coordinator, entry: ConfigEntry) -> None:
+        super().__init__(coordinator, entry, "eta")
+
+    @property
+    def native_value(self) -> datetime | None:
+        eta = self.coordinator.eta
+        return eta.arrival if eta and self.data.get(ATTR_ACTIVE) else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        eta = self.coordinator.eta
+        if eta is None or not self.data.get(ATTR_ACTIVE):
+            return {}
+        return {
+            "confidence": eta.confidence,
+            "distance_km": round(eta.distance_m / 1000, 2) if eta.distance_m is not None else None,
+            "speed_kmh": round(eta.speed_mps * 3.6, 1) if eta.speed_mps is not None else None,
+        }
+
+    def _state_key(self) -> Any:
+        return (self.native_value, tuple(self.extra_state_attributes.items()))
+
+
+class DodoDeliveryLastCheckedSensor(SensorEntity):
+    """Diagnostic: time of the last completed poll, whether or not anything changed.
+
+    Kept separate from the main sensor so the per-poll timestamp doesn't rewrite
+    the large attribute set; disabled by default.
+    """
+
+    _attr_has_entity_name = True
+    _attr_name = "Last checked"
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_should_poll = False
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+
+    def __init__(self, coordinator, entry: ConfigEntry) -> None:
+        self.coordinator = coordinator
+        self._attr_unique_id = f"{DOMAIN}_{entry.entry_id}_last_checked"
+        self._attr_device_info = entry_device_info(entry)
+        self._attr_icon = "mdi:update"
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_add_check_listener(self._handle_check))
+
+    @callback
+    def _handle_check(self) -> None:
+        self.async_write_ha_state()
+
+    @property
+    def native_value(self):
+        return self.coordinator.last_checked
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        # Seconds until the next poll as chosen by the adaptive scheduler (None = idle),
+        # plus how many polls were answered without decoding/merging anything.
+        # Failure handling: backoff of this entry and the shared per-host circuit breakers.
+        coordinator = self.coordinator
+        return {
+            ATTR_POLL_INTERVAL: coordinator.poll_interval,
+            **coordinator.stats,
+            "consecutive_failures": coordinator.consecutive_failures,
+            "retry_at": coordinator.retry_at.isoformat() if coordinator.retry_at else None,
+            "circuit_breakers": {host: breaker.as_dict() for host, breaker in coordinator.api.breakers.items()},
+        }
+
+
+class DodoDeliveryMetricSensor(SensorEntity):
+    """Diagnostic: one performance figure of the entry, refreshed after every poll.
+
+    Disabled by default; latency needs "Collect performance metrics" in the options.
+    """
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_should_poll = False
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+
+    def __init__(self, coordinator, entry: ConfigEntry, key: str, name: str, unit: str | None, device_class, state_class, icon: str) -> None:
+        self.coordinator = coordinator
+        self._key = key
+        self._attr_name = name
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = device_class
+        self._attr_state_class = state_class
+        self._attr_icon = icon
+        self._attr_unique_id = f"{DOMAIN}_{entry.entry_id}_{key}"
+        self._attr_device_info = entry_device_info(entry)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_add_check_listener(self._handle_check))
+
+    @callback
+    def _handle_check(self) -> None:
+        self.async_write_ha_state()
+
+    @property
+    def native_value(self) -> float | int | None:
+        coordinator = self.coordinator
+        if self._key == "request_latency":
+            if coordinator.metrics is None:
+                return None
+            mean = coordinator.metrics.histograms["request"].mean
+            return round(mean, 1) if mean is not None else None
+        if self._key == "poll_interval":
+            return coordinator.poll_interval
+        if self._key == "detail_cache_hit_ratio":
+            ratio = coordinator.detail_cache_hit_ratio
+            return round(ratio * 100, 1) if ratio is not None else None
+        return coordinator.stats[self._key]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        coordinator = self.coordinator
+        if self._key == "request_latency" and coordinator.metrics is not None:
+            hist = coordinator.metrics.histograms["request"]
+            return {"count": hist.count, "p95_ms": hist.quantile(0.95), "max_ms": round(hist.max, 1)}
+        if self._key == "failures":
+            return {"consecutive_failures": coordinator.consecutive_failures, "retries": coordinator.stats["retries"]}
+        if self._key == "detail_cache_hit_ratio":
+            return {"hits": coordinator.stats["detail_cache_hits"], "misses": coordinator.stats["detail_cache_misses"]}
+        return None
+
+
+class DodoDeliveryFleetSensor(SensorEntity):
+    """Number of deliveries under way across all entries, with a summary.
+
+    Fed by the fleet index, so a dashboard doesn't need templates that walk
+    every delivery sensor on each state change.
+    """
+
+    _attr_name = "DODO deliveries"
+    _attr_unique_id = f"{DOMAIN}_fleet"
+    _attr_icon = "mdi:truck-delivery"
+    _attr_native_unit_of_measurement = "deliveries"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_should_poll = False
+
+    def __init__(self, fleet: FleetIndex) -> None:
+        self.fleet = fleet
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self.fleet.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> int:
+        return len(self.fleet.active_codes)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        # Counts by status (enum states), active codes, next expected arrival and its code
+        return self.fleet.as_dict()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from array import array
+import math
+
+from .const import TRACK_CAPACITY, TRACK_SIMPLIFY_TOLERANCE_M
+from .helpers import EARTH_RADIUS_M
+
+Fix = tuple[float, float, float]  # (unix timestamp, latitude, longitude)
+
+
+def _offset_m(origin: Fix, point: Fix) -> tuple[float, float]:
+    """Local equirectangular projection of `point` around `origin`, in meters."""
+    lat0 = math.radians(origin[1])
+    x = math.radians(point[2] - origin[2]) * math.cos(lat0) * EARTH_RADIUS_M
+    y = math.radians(point[1] - origin[1]) * EARTH_RADIUS_M
+    return x, y
+
+
+def _segment_distance_m(a: Fix, b: Fix, p: Fix) -> float:
+    """Distance of `p` from the segment a-b, in meters."""
+    bx, by = _offset_m(a, b)
+    px, py = _offset_m(a, p)
+    seg2 = bx * bx + by * by
+    if seg2 == 0:
+        return math.hypot(px, py)
+    t = max(0.0, min(1.0, (px * bx + py * by) / seg2))
+    return math.hypot(px - t * bx, py - t * by)
+
+
+class CourierTrack:
+    """Fixed-size, array-backed ring buffer of courier fixes.
+
+    Next to the raw fixes an incrementally simplified polyline is maintained:
+    each new fix either replaces the last simplified vertex (when that vertex
+    lies within `tolerance_m` of the segment from the vertex before it to the
+    new fix) or is appended. That is a streaming variant of Douglas-Peucker,
+    O(1) per fix instead of re-simplifying the whole track.
+    """
+
+    __slots__ = ("capacity", "tolerance_m", "_ts", "_lat", "_lon", "_start", "_len", "_simplified")
+
+    def __init__(self, capacity: int = TRACK_CAPACITY, tolerance_m: float = TRACK_SIMPLIFY_TOLERANCE_M) -> None:
+        self.capacity = capacity
+        self.tolerance_m = tolerance_m
+        self._ts = array("d", bytes(8 * capacity))
+        self._lat = array("d", bytes(8 * capacity))
+        self._lon = array("d", bytes(8 * capacity))
+        self._start = 0
+        self._len = 0
+        self._simplified: list[Fix] = []
+
+    def __len__(self) -> int:
+        return self._len
+
+    def clear(self) -> None:
+        self._start = 0
+        self._len = 0
+        self._simplified.clear()
+
+    def last(self) -> Fix | None:
+        if not self._len:
+            return None
+        i = (self._start + self._len - 1) % self.capacity
+        return (self._ts[i], self._lat[i], self._lon[i])
+
+    def append(self, ts: float, lat: float, lon: float) -> bool:
+        """Add a fix; returns False (and stores nothing) if the courier didn't move."""
+        last = self.last()
+        if last is not None and last[1] == lat and last[2] == lon:
+            return False
+
+        if self._len < self.capacity:
+            i = (self._start + self._len) % self.capacity
+            self._len += 1
+        else:
+            # Full: overwrite the oldest fix.
+            i = self._start
+            self._start = (self._start + 1) % self.capacity
+        self._ts[i], self._lat[i], self._lon[i] = ts, lat, lon
+
+        fix = (ts, lat, lon)
+        simp = self._simplified
+        if len(simp) >= 2 and _segment_distance_m(simp[-2], fix, simp[-1]) <= self.tolerance_m:
+            simp[-1] = fix
+        else:
+            simp.append(fix)
+        # Drop simplified vertices older than the oldest retained fix (keep one as anchor).
+        oldest = self._ts[self._start]
+        while len(simp) > 2 and simp[1][0] <= oldest:
+            simp.pop(0)
+        return True
+
+    def points(self) -> list[Fix]:
+        cap = self.capacity
+        return [
+            (self._ts[j], self._lat[j], self._lon[j])
+            for j in ((self._start + k) % cap for k in range(self._len))
+        ]
+
+    def simplified(self) -> list[Fix]:
+        return list(self._simplified)
+
+    def recent(self, count: int) -> list[Fix]:
+        """The last `count` fixes, oldest first."""
+        count = min(count, self._len)
+        cap = self.capacity
+        end = self._start + self._len
+        return [(self._ts[j % cap], self._lat[j % cap], self._lon[j % cap]) for j in range(end - count, end)]
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .coordinator import DodoDeliveryCoordinator
+from .track import Fix
+
+TARGET_SCHEMA = {
+    vol.Exclusive("entry_id", "target"): str,
+    vol.Exclusive("entity_id", "target"): str,
+}
+
+
+@callback
+def async_register_websocket_api(hass: HomeAssistant) -> None:
+    websocket_api.async_register_command(hass, ws_track)
+    websocket_api.async_register_command(hass, ws_subscribe_track)
+    websocket_api.async_register_command(hass, ws_archive)
+
+
+def _resolve(hass: HomeAssistant, msg: dict[str, Any]) -> DodoDeliveryCoordinator | None:
+    """Find the coordinator by config entry id or by any entity id of the entry.
+
+    An entity of an additional tracking code resolves to that code's child coordinator.
+    """
+    entry_id = msg.get("entry_id")
+    reg_entry = None
+    if entry_id is None and msg.get("entity_id"):
+        reg_entry = er.async_get(hass).async_get(msg["entity_id"])
+        entry_id = reg_entry.config_entry_id if reg_entry else None
+    if entry_id is None or entry_id.startswith("_"):
+        return None
+    coordinator = hass.data.get(DOMAIN, {}).get(entry_id)
+    if coordinator is not None and reg_entry is not None:
+        for child in coordinator.children.values():
+            if reg_entry.unique_id.startswith(f"{child.unique_prefix}_") or reg_entry.unique_id == child.unique_prefix:
+                return child
+    return coordinator
+
+
+def _track_payload(coordinator: DodoDeliveryCoordinator) -> dict[str, Any]:
+    return {
+        "tracking_code": coordinator.data.get("tracking_code") if coordinator.data else None,
+        "points": coordinator.track.points(),
+        "simplified": coordinator.track.simplified(),
+    }
+
+
+@websocket_api.websocket_command({vol.Required("type"): "dodo_delivery/track", **TARGET_SCHEMA})
+@callback
+def ws_track(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]) -> None:
+    """Return the courier track: raw fixes and the simplified polyline, as [ts, lat, lon]."""
+    coordinator = _resolve(hass, msg)
+    if coordinator is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "DODO delivery entry not found")
+        return
+    connection.send_result(msg["id"], _track_payload(coordinator))
+
+
+@websocket_api.websocket_command({vol.Required("type"): "dodo_delivery/track/subscribe", **TARGET_SCHEMA})
+@callback
+def ws_subscribe_track(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]) -> None:
+    """Send the current track, then every appended fix (or a reset when the code changes)."""
+    coordinator = _resolve(hass, msg)
+    if coordinator is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "DODO delivery entry not found")
+        return
+
+    @callback
+    def forward(fix: Fix | None) -> None:
+        if fix is None:
+            event = {"reset": True}
+        else:
+            # The last two simplified vertices are all that can change on an append.
+            event = {"point": fix, "simplified_tail": coordinator.track.simplified()[-2:]}
+        connection.send_message(websocket_api.event_message(msg["id"], event))
+
+    connection.subscriptions[msg["id"]] = coordinator.async_add_track_listener(forward)
+    connection.send_result(msg["id"])
+    connection.send_message(websocket_api.event_message(msg["id"], {"snapshot": _track_payload(coordinator)}))
+
+
+# An unparsable `since` is answered with ERR_INVALID_FORMAT by the schema.
+@websocket_api.websocket_command({vol.Required("type"): "dodo_delivery/archive", vol.Optional("since"): cv.datetime})
+@callback
+def ws_archive(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]) -> None:
+    """Return the archived completed deliveries, optionally only those finished after `since` (ISO)."""
+    archive = hass.data.get(DOMAIN, {}).get("_archive")
+    if archive is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "No DODO delivery entry is loaded")
+        return
+    # Naive times are local (HA time zone), archive times are aware.
+    since = dt_util.as_utc(msg["since"]) if msg.get("since") else None
+    connection.send_result(msg["id"], {"deliveries": archive.since(since)})
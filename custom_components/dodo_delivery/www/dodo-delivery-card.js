@@ -1,7 +1,9 @@
 /* dodo-delivery-card.js
  * Home Assistant Lovelace custom card
- * v0.2.4
+ * v0.2.5
  *
+ * Courier position is read from the courier device_tracker (courier_entity_id attribute).
+ * Courier trail: subscribes to dodo_delivery/track/subscribe (simplified polyline + live appends).
  * Fix: Leaflet pane z-index CSS so polylines render above tiles.
  * Supports route formats:
  *  - route: {sections:[{polyline:[{latitude,longitude}]}]}
@@ -356,9 +358,63 @@
       this._resizeObserver.observe(mapEl);
 
       this._leafletReady = true;
+      this._subscribeTrack();
+    }
+
+    // One websocket subscription per card: full simplified track once, then appended fixes.
+    _subscribeTrack() {
+      if (this._trackSub || !this._hass?.connection) return;
+      this._trail = [];
+      this._trackSub = this._hass.connection
+        .subscribeMessage((ev) => this._onTrackEvent(ev), {
+          type: "dodo_delivery/track/subscribe",
+          entity_id: this._config?.entity || DEFAULT_ENTITY,
+        })
+        .catch(() => null);
+    }
+
+    _unsubscribeTrack() {
+      const sub = this._trackSub;
+      this._trackSub = null;
+      if (sub) sub.then((unsub) => { try { unsub && unsub(); } catch (_) {} });
+    }
+
+    _onTrackEvent(ev) {
+      if (ev.snapshot) this._trail = ev.snapshot.simplified || [];
+      else if (ev.reset) this._trail = [];
+      else if (Array.isArray(ev.simplified_tail) && ev.simplified_tail.length) {
+        // The tail replaces everything from its first vertex on.
+        const tail = ev.simplified_tail;
+        const i = this._trail.findIndex((p) => p[0] === tail[0][0]);
+        this._trail = i >= 0 ? this._trail.slice(0, i).concat(tail) : tail.slice();
+      }
+      this._drawTrail();
+    }
+
+    _drawTrail() {
+      const L = window.L;
+      if (!L || !this._map) return;
+      const pts = (this._trail || []).map((p) => [p[1], p[2]]);
+      if (pts.length < 2) {
+        if (this._trailLine) { this._map.removeLayer(this._trailLine); this._trailLine = null; }
+        return;
+      }
+      if (!this._trailLine) {
+        this._trailLine = L.polyline(pts, {
+          pane: "overlayPane",
+          color: safeColor(this, "--info-color", "#3498db"),
+          weight: 4,
+          opacity: 0.8,
+          dashArray: "6 6",
+        }).addTo(this._map);
+      } else {
+        this._trailLine.setLatLngs(pts);
+      }
     }
 
     _destroyLeaflet() {
+      this._unsubscribeTrack();
+      this._trailLine = null;
       try { this._resizeObserver?.disconnect(); } catch (_) {}
       this._resizeObserver = null;
       try { this._map?.remove(); } catch (_) {}
@@ -369,10 +425,17 @@
       this._userInteracted = false;
     }
 
+    // Courier position: the integration's device_tracker (courier_entity_id), legacy attributes as fallback.
+    _agentCoords(attrs) {
+      const tracker = attrs?.courier_entity_id ? this._hass?.states?.[attrs.courier_entity_id] : null;
+      if (tracker) return coordsFromKeys(tracker.attributes, "latitude", "longitude");
+      return coordsFromKeys(attrs, "agent_latitude", "agent_longitude");
+    }
+
     _computeMapKey(codeRaw, attrs) {
       const pu = coordsFromKeys(attrs, "pickup_latitude", "pickup_longitude");
       const dr = coordsFromKeys(attrs, "drop_latitude", "drop_longitude");
-      const ag = coordsFromKeys(attrs, "agent_latitude", "agent_longitude");
+      const ag = this._agentCoords(attrs);
       const route = pickRouteFromAttrs(attrs);
       const routeKey = route ? `${route.length}:${route[0][0].toFixed(5)},${route[0][1].toFixed(5)}:${route[route.length-1][0].toFixed(5)},${route[route.length-1][1].toFixed(5)}` : "-";
       return [sanitizeCode(codeRaw), pu?`${pu.lat.toFixed(6)},${pu.lon.toFixed(6)}`:"-", dr?`${dr.lat.toFixed(6)},${dr.lon.toFixed(6)}`:"-", ag?`${ag.lat.toFixed(6)},${ag.lon.toFixed(6)}`:"-", routeKey].join("|");
@@ -385,7 +448,7 @@
 
       const pu = coordsFromKeys(attrs, "pickup_latitude", "pickup_longitude");
       const dr = coordsFromKeys(attrs, "drop_latitude", "drop_longitude");
-      const ag = coordsFromKeys(attrs, "agent_latitude", "agent_longitude");
+      const ag = this._agentCoords(attrs);
       const route = pickRouteFromAttrs(attrs);
 
       if (!pu && !dr && !route) {
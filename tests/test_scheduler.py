@@ -0,0 +1,53 @@
+"""compute_poll_interval must return an interval for every delivery phase."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.dodo_delivery.model import STATUS_SHORT_HU, DeliverySnapshot  # noqa: E402
+from custom_components.dodo_delivery.scheduler import PollPolicy, compute_poll_interval  # noqa: E402
+
+NOW = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)
+POLICY = PollPolicy(base=60, near=15, idle=300)
+
+PAYLOADS = {
+    "bare": {},
+    "courier_far": {
+        "agentLatitude": 47.60,
+        "agentLongitude": 19.20,
+        "dropQuestInfo": {"latitude": 47.49, "longitude": 19.04},
+        "expectedStart": (NOW + timedelta(minutes=40)).isoformat(),
+    },
+    "courier_near": {
+        "agentLatitude": 47.491,
+        "agentLongitude": 19.041,
+        "dropQuestInfo": {"latitude": 47.49, "longitude": 19.04},
+    },
+    "window_only": {
+        "requiredStart": (NOW + timedelta(hours=2)).isoformat(),
+        "requiredEnd": (NOW + timedelta(hours=3)).isoformat(),
+    },
+}
+
+
+@pytest.mark.parametrize("payload", PAYLOADS.values(), ids=PAYLOADS.keys())
+@pytest.mark.parametrize("status", [*STATUS_SHORT_HU, "SomethingNew", None])
+@pytest.mark.parametrize("adaptive", [True, False])
+def test_every_status_gets_an_interval(status: str | None, payload: dict, adaptive: bool) -> None:
+    source = dict(payload)
+    if status is not None:
+        source["status"] = status
+    policy = PollPolicy(POLICY.base, POLICY.near, POLICY.idle, adaptive)
+
+    interval = compute_poll_interval(DeliverySnapshot(source), NOW, policy)
+
+    assert isinstance(interval, int)
+    assert POLICY.near <= interval <= POLICY.idle
+
+
+def test_courier_close_to_the_drop_point_polls_fast() -> None:
+    snapshot = DeliverySnapshot({"status": "OnWay", **PAYLOADS["courier_near"]})
+    assert compute_poll_interval(snapshot, NOW, POLICY) == POLICY.near
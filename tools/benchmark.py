@@ -0,0 +1,210 @@
+"""Load-test benchmark for the dodo_delivery integration against tools/mock_gaia.py.
+
+Boots a throw-away Home Assistant instance, starts the mock Gaia API in a
+subprocess (so its CPU time doesn't pollute the measurement), adds N
+manual-mode config entries through the real config flow and lets them run
+for a while. Per scenario it reports:
+
+    http_requests_per_delivery   requests seen by the mock server / entries
+    loop_cpu_ms_per_update       CPU time of the event loop thread / completed polls
+                                 (executor threads and the mock server are not counted)
+    alloc_kib_per_update         traced memory growth over the run (tracemalloc snapshot diff) / completed polls,
+                                 with --trace-alloc
+    peak_traced_kib              peak traced memory during the run, with --trace-alloc
+    state_writes                 state_changed events of the integration's entities
+    latency_p50_s / latency_p95_s   mock status change -> Status sensor state change
+
+Results are printed and appended as one JSON line per scenario to
+--output (default bench_output.txt) so runs can be compared over time.
+
+    python tools/benchmark.py --entries 10,100,500 --duration 120
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+from pathlib import Path
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import aiohttp
+
+from homeassistant import bootstrap, runner
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, callback
+from homeassistant.helpers import entity_registry as er
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from custom_components.dodo_delivery.api import GaiaApi, create_session  # noqa: E402
+from custom_components.dodo_delivery.const import DOMAIN  # noqa: E402
+
+SCENARIOS = {
+    "lifecycle": "L",
+    "not_found": "N",
+    "rate_limited": "R",
+    "slow": "S",
+}
+
+_CAMEL_RE = re.compile(r"(?<!^)(?=[A-Z])")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _codes(prefix: str, count: int) -> list[str]:
+    return [f"{prefix}{i:07d}" for i in range(count)]
+
+
+async def _start_hass(config_dir: Path):
+    (config_dir / "custom_components").mkdir(parents=True, exist_ok=True)
+    link = config_dir / "custom_components" / DOMAIN
+    if not link.exists():
+        link.symlink_to(ROOT / "custom_components" / DOMAIN)
+    (config_dir / "configuration.yaml").write_text(
+        "homeassistant:\n  name: bench\n  time_zone: UTC\n"
+        f"http:\n  server_host: 127.0.0.1\n  server_port: {_free_port()}\n"
+    )
+    hass = await bootstrap.async_setup_hass(
+        runner.RuntimeConfig(config_dir=str(config_dir), skip_pip=True)
+    )
+    await hass.async_start()
+    return hass
+
+
+async def _add_entry(hass, code: str) -> None:
+    flow = await hass.config_entries.flow.async_init(DOMAIN, context={"source": "user"})
+    flow = await hass.config_entries.flow.async_configure(flow["flow_id"], {"mode": "manual"})
+    await hass.config_entries.flow.async_configure(flow["flow_id"], {"tracking_code": code})
+
+
+async def run_scenario(name: str, entries: int, duration: float, mock_url: str, trace_alloc: bool) -> dict:
+    with tempfile.TemporaryDirectory(prefix="dodo-bench-") as tmp:
+        hass = await _start_hass(Path(tmp))
+        # Point every entry at the mock server through the shared API object.
+        hass.data.setdefault(DOMAIN, {})["_api"] = GaiaApi(create_session(False), base_url=mock_url)
+
+        writes = 0
+        seen: dict[str, list[tuple[str, float]]] = {}
+
+        @callback
+        def _on_state(event: Event) -> None:
+            nonlocal writes
+            entity_id = event.data["entity_id"]
+            reg = er.async_get(hass).async_get(entity_id)
+            if reg is None or reg.platform != DOMAIN:
+                return
+            writes += 1
+            new = event.data.get("new_state")
+            if reg.unique_id.endswith("_status") and new is not None:
+                seen.setdefault(reg.config_entry_id, []).append((new.state, time.time()))
+
+        hass.bus.async_listen(EVENT_STATE_CHANGED, _on_state)
+
+        codes = _codes(SCENARIOS[name], entries)
+        for code in codes:
+            await _add_entry(hass, code)
+        await hass.async_block_till_done()
+
+        coordinators = [c for k, c in hass.data[DOMAIN].items() if not k.startswith("_")]
+        polls_before = sum(c.stats["polls"] for c in coordinators)
+        # This coroutine runs on the loop thread, so the thread's CPU clock is the loop's.
+        cpu_before = time.thread_time()
+        snapshot_before = None
+        if trace_alloc:
+            tracemalloc.start()
+            snapshot_before = tracemalloc.take_snapshot()
+        await asyncio.sleep(duration)
+        cpu = time.thread_time() - cpu_before
+        allocated = peak = 0
+        if snapshot_before is not None:
+            diff = tracemalloc.take_snapshot().compare_to(snapshot_before, "filename")
+            allocated = sum(stat.size_diff for stat in diff)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        polls = max(1, sum(c.stats["polls"] for c in coordinators) - polls_before)
+
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{mock_url}/_stats") as resp:
+                stats = await resp.json()
+            async with session.get(f"{mock_url}/_transitions") as resp:
+                transitions = await resp.json()
+
+        # Latency: first time each entry's Status sensor showed a status after the mock switched to it.
+        latencies = []
+        code_by_entry = {c.entry.entry_id: c.entry.data.get("tracking_code") for c in coordinators}
+        for entry_id, states in seen.items():
+            for status, changed_at in transitions.get(code_by_entry.get(entry_id), []):
+                wanted = _CAMEL_RE.sub("_", status).lower()
+                hit = next((t for s, t in states if s == wanted and t >= changed_at), None)
+                if hit is not None:
+                    latencies.append(hit - changed_at)
+
+        await hass.async_stop(force=True)
+
+    total_requests = sum(v for k, v in stats["requests"].items() if k in ("detail", "status"))
+    result = {
+        "scenario": name,
+        "entries": entries,
+        "duration_s": duration,
+        "polls": polls,
+        "http_requests_per_delivery": round(total_requests / entries, 2),
+        "loop_cpu_ms_per_update": round(cpu * 1000 / polls, 3),
+        "alloc_kib_per_update": round(allocated / 1024 / polls, 2) if trace_alloc else None,
+        "peak_traced_kib": round(peak / 1024, 1) if trace_alloc else None,
+        "state_writes": writes,
+        "latency_p50_s": round(statistics.median(latencies), 2) if latencies else None,
+        "latency_p95_s": round(statistics.quantiles(latencies, n=20)[-1], 2) if len(latencies) >= 2 else None,
+        "server": stats["requests"],
+    }
+    return result
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    for entries in [int(n) for n in args.entries.split(",")]:
+        for name in args.scenarios.split(","):
+            port = _free_port()
+            server = subprocess.Popen(
+                [sys.executable, str(ROOT / "tools" / "mock_gaia.py"), "--port", str(port),
+                 "--phase-seconds", str(args.phase_seconds)],
+            )
+            try:
+                await asyncio.sleep(1.0)
+                result = await run_scenario(name, entries, args.duration, f"http://127.0.0.1:{port}", args.trace_alloc)
+            finally:
+                server.terminate()
+                server.wait()
+            result["run_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+            result["git_rev"] = os.popen(f"git -C {ROOT} rev-parse --short HEAD").read().strip()
+            line = json.dumps(result)
+            print(line)
+            if args.output:
+                with open(args.output, "a", encoding="utf-8") as fh:
+                    fh.write(line + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", default="10,100", help="comma separated entry counts")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma separated: " + ", ".join(SCENARIOS))
+    parser.add_argument("--duration", type=float, default=120.0, help="seconds to run each scenario")
+    parser.add_argument("--phase-seconds", type=float, default=20.0, help="mock lifecycle phase duration")
+    parser.add_argument("--trace-alloc", action="store_true", help="measure allocations (slows the run down)")
+    parser.add_argument("--output", default=str(ROOT / "bench_output.txt"))
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Snapshot or track many DODO tracking codes with the integration's API client, without Home Assistant.
+
+Codes are taken from the arguments or, when there are none, from stdin (any
+text: t.idodo.group links, or bare 8-character codes if it has no links). Results
+are streamed to stdout as JSON lines in completion order; a throughput
+summary (codes/s, requests on the wire, coalesced requests) goes to stderr.
+
+    snapshot   detail + status of every code once:
+               {"code", "ok", "error", "elapsed_ms", "detail", "status"}
+    track      status of every code every --interval seconds, one line per change:
+               {"code", "time", "old_status", "new_status", "status"}
+               until every code is finished/unknown or --duration is over
+
+    python tools/gaia_bulk.py snapshot ABCD1234 EFGH5678
+    python tools/gaia_bulk.py track --interval 20 < codes.txt
+    python tools/gaia_bulk.py snapshot --base-url http://127.0.0.1:8089 < codes.txt   # against tools/mock_gaia.py
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import datetime, timezone
+import json
+from pathlib import Path
+import sys
+import time
+import types
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The package __init__ sets up the Home Assistant integration; the API modules
+# themselves only need aiohttp, so load them without it.
+_package = types.ModuleType("dodo_delivery")
+_package.__path__ = [str(ROOT / "custom_components" / "dodo_delivery")]
+sys.modules["dodo_delivery"] = _package
+
+from dodo_delivery.api import GaiaApi, create_session  # noqa: E402
+from dodo_delivery.const import API_BASE, HTTP_CONNECTIONS_PER_HOST  # noqa: E402
+from dodo_delivery.helpers import extract_codes  # noqa: E402
+
+# Statuses after which a code is no longer tracked
+TERMINAL_STATUSES = {"FINISHED", "DELIVERED", "CANCELLED", "FAILED"}
+
+
+def _emit(record: dict) -> None:
+    sys.stdout.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+    sys.stdout.flush()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _status_code(payload) -> str | None:
+    return payload.get("status") if isinstance(payload, dict) else None
+
+
+async def snapshot(api: GaiaApi, codes: list[str], concurrency: int) -> int:
+    failed = 0
+    async for result in api.async_fetch_many(codes, concurrency):
+        failed += result.error is not None
+        _emit(
+            {
+                "code": result.code,
+                "ok": result.error is None and result.status is not None,
+                "error": result.error,
+                "elapsed_ms": round(result.elapsed * 1000, 1),
+                "detail": result.detail,
+                "status": result.status,
+            }
+        )
+    return failed
+
+
+async def track(api: GaiaApi, codes: list[str], concurrency: int, interval: float, duration: float | None) -> int:
+    last: dict[str, str | None] = {}
+    active = list(codes)
+    deadline = time.monotonic() + duration if duration else None
+    failed = 0
+    while active:
+        round_started = time.monotonic()
+        done: set[str] = set()
+        async for result in api.async_fetch_many(active, concurrency, detail=False):
+            if result.error is not None:
+                failed += 1
+                _emit({"code": result.code, "time": _now(), "error": result.error})
+                continue
+            status = _status_code(result.status)
+            if result.status is None or (status or "").upper() in TERMINAL_STATUSES:
+                done.add(result.code)
+            if result.code not in last or status != last[result.code]:
+                _emit(
+                    {
+                        "code": result.code,
+                        "time": _now(),
+                        "old_status": last.get(result.code),
+                        "new_status": status,
+                        "status": result.status,
+                    }
+                )
+                last[result.code] = status
+        active = [code for code in active if code not in done]
+        if not active or (deadline is not None and time.monotonic() >= deadline):
+            break
+        await asyncio.sleep(max(0.0, interval - (time.monotonic() - round_started)))
+    return failed
+
+
+async def run(args: argparse.Namespace) -> int:
+    codes = extract_codes(" ".join(args.codes) if args.codes else sys.stdin.read())
+    if not codes:
+        print("no tracking codes given", file=sys.stderr)
+        return 2
+
+    # No response cache: every round must see fresh data; concurrent duplicates are still coalesced.
+    api = GaiaApi(create_session(), args.base_url.rstrip("/"), cache_ttl=0)
+    started = time.monotonic()
+    try:
+        if args.command == "snapshot":
+            failed = await snapshot(api, codes, args.concurrency)
+        else:
+            failed = await track(api, codes, args.concurrency, args.interval, args.duration)
+    finally:
+        await api.async_close()
+    elapsed = time.monotonic() - started
+    summary = {
+        "codes": len(codes),
+        "failed": failed,
+        "seconds": round(elapsed, 2),
+        "codes_per_second": round(len(codes) / elapsed, 1) if args.command == "snapshot" and elapsed else None,
+        **api.stats,
+    }
+    print(json.dumps(summary), file=sys.stderr)
+    return 1 if failed else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["snapshot", "track"])
+    parser.add_argument("codes", nargs="*", help="tracking codes or links (default: read from stdin)")
+    parser.add_argument("--base-url", default=API_BASE)
+    parser.add_argument("--concurrency", type=int, default=HTTP_CONNECTIONS_PER_HOST, help="codes fetched at a time")
+    parser.add_argument("--interval", type=float, default=20.0, help="track: seconds between rounds")
+    parser.add_argument("--duration", type=float, default=None, help="track: stop after this many seconds")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Offline stand-in for api.gaia.delivery.
+
+Serves /order-tracking/orders/{code}/detail and /status from scripted
+delivery lifecycles, so the integration can be exercised and benchmarked
+without touching the real API. The first character of the tracking code
+selects the scenario:
+
+    L...  full lifecycle: PickupStarted -> PickupCompleted -> OnWay -> NearDestination -> Finished
+    N...  404 on every request
+    R...  lifecycle, but every 5th status request is answered with 429 + Retry-After
+    S...  lifecycle with slow responses (--slow-delay seconds)
+
+Any other code behaves like "L". A lifecycle starts with the first request
+for that code. Status responses carry an ETag, so conditional requests can
+be answered with 304.
+
+Bookkeeping endpoints: GET /_stats (request counters) and GET /_transitions
+(wall-clock time of every status change per code, for latency measurements).
+
+    python tools/mock_gaia.py --port 8089 --phase-seconds 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+import hashlib
+import json
+import math
+import time
+
+from aiohttp import web
+
+PHASES = ["PickupStarted", "PickupCompleted", "OnWay", "NearDestination", "Finished"]
+
+PICKUP = (47.4979, 19.0402)
+DROP = (47.5316, 19.0903)
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class Lifecycle:
+    """Deterministic delivery timeline for one tracking code."""
+
+    def __init__(self, code: str, started: float, phase_seconds: float) -> None:
+        self.code = code
+        self.started = started
+        self.phase_seconds = phase_seconds
+        # Spread codes a little so not every delivery changes status at the same instant.
+        self.offset = (int(hashlib.sha1(code.encode()).hexdigest(), 16) % 1000) / 1000 * phase_seconds
+
+    def phase_index(self, now: float) -> int:
+        elapsed = now - self.started - self.offset
+        return max(0, min(len(PHASES) - 1, int(elapsed // self.phase_seconds)))
+
+    def change_time(self, index: int) -> float:
+        return self.started + self.offset + index * self.phase_seconds
+
+    def courier_position(self, now: float) -> tuple[float, float] | None:
+        index = self.phase_index(now)
+        if index < 2:
+            return None
+        on_way = self.change_time(2)
+        arrive = self.change_time(4)
+        frac = max(0.0, min(1.0, (now - on_way) / (arrive - on_way)))
+        # Slight curve so the track simplification has something to do.
+        bend = 0.004 * math.sin(frac * math.pi)
+        return (
+            PICKUP[0] + (DROP[0] - PICKUP[0]) * frac + bend,
+            PICKUP[1] + (DROP[1] - PICKUP[1]) * frac,
+        )
+
+    def detail(self) -> dict:
+        return {
+            "shortCode": self.code[-4:],
+            "partnerIdentifier": f"TESCO-{self.code}",
+            "requiredStart": _iso(self.started),
+            "requiredEnd": _iso(self.started + 6 * self.phase_seconds),
+            "pickupQuestInfo": {"name": "Mock store", "latitude": PICKUP[0], "longitude": PICKUP[1]},
+            "dropQuestInfo": {"latitude": DROP[0], "longitude": DROP[1]},
+            "agent": {"agentIdentifier": "mock-1", "name": "Mock Courier"},
+            "vehicle": {"name": "Mock van"},
+        }
+
+    def status(self, now: float) -> dict:
+        index = self.phase_index(now)
+        payload: dict = {
+            "status": PHASES[index],
+            "expectedStart": _iso(self.change_time(4)),
+        }
+        pos = self.courier_position(now)
+        if pos is not None and index < 4:
+            payload["agentLatitude"], payload["agentLongitude"] = round(pos[0], 6), round(pos[1], 6)
+        if index == 4:
+            payload["finished"] = _iso(self.change_time(4))
+        return payload
+
+
+class MockGaia:
+    def __init__(self, phase_seconds: float, slow_delay: float) -> None:
+        self.phase_seconds = phase_seconds
+        self.slow_delay = slow_delay
+        self.lifecycles: dict[str, Lifecycle] = {}
+        self.requests: Counter[str] = Counter()
+        self.per_code: Counter[str] = Counter()
+        self.status_calls: Counter[str] = Counter()
+
+    def lifecycle(self, code: str) -> Lifecycle:
+        if code not in self.lifecycles:
+            self.lifecycles[code] = Lifecycle(code, time.time(), self.phase_seconds)
+        return self.lifecycles[code]
+
+    async def _common(self, request: web.Request, kind: str) -> tuple[str, web.Response | None]:
+        code = request.match_info["code"].upper()
+        self.requests[kind] += 1
+        self.per_code[code] += 1
+        if code.startswith("N"):
+            self.requests["404"] += 1
+            return code, web.json_response({"error": "not found"}, status=404)
+        if code.startswith("S") and self.slow_delay:
+            await asyncio.sleep(self.slow_delay)
+        return code, None
+
+    async def handle_detail(self, request: web.Request) -> web.Response:
+        code, early = await self._common(request, "detail")
+        if early is not None:
+            return early
+        return web.json_response(self.lifecycle(code).detail())
+
+    async def handle_status(self, request: web.Request) -> web.Response:
+        code, early = await self._common(request, "status")
+        if early is not None:
+            return early
+        self.status_calls[code] += 1
+        if code.startswith("R") and self.status_calls[code] % 5 == 0:
+            self.requests["429"] += 1
+            return web.json_response({"error": "rate limited"}, status=429, headers={"Retry-After": "3"})
+
+        body = json.dumps(self.lifecycle(code).status(time.time()), separators=(",", ":")).encode()
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        if request.headers.get("If-None-Match") == etag:
+            self.requests["304"] += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(body=body, content_type="application/json", headers={"ETag": etag})
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"requests": dict(self.requests), "codes": len(self.per_code), "per_code": dict(self.per_code)})
+
+    async def handle_transitions(self, request: web.Request) -> web.Response:
+        now = time.time()
+        out: dict[str, list] = defaultdict(list)
+        for code, life in self.lifecycles.items():
+            for index in range(1, life.phase_index(now) + 1):
+                out[code].append([PHASES[index], life.change_time(index)])
+        return web.json_response(out)
+
+
+def create_app(phase_seconds: float = 20.0, slow_delay: float = 2.0) -> web.Application:
+    mock = MockGaia(phase_seconds, slow_delay)
+    app = web.Application()
+    app.router.add_get("/order-tracking/orders/{code}/detail", mock.handle_detail)
+    app.router.add_get("/order-tracking/orders/{code}/status", mock.handle_status)
+    app.router.add_get("/_stats", mock.handle_stats)
+    app.router.add_get("/_transitions", mock.handle_transitions)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--phase-seconds", type=float, default=20.0, help="duration of each lifecycle phase")
+    parser.add_argument("--slow-delay", type=float, default=2.0, help="response delay for S... codes")
+    args = parser.parse_args()
+    web.run_app(create_app(args.phase_seconds, args.slow_delay), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()